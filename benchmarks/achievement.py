@@ -0,0 +1,85 @@
+"""
+Achievement rendering: the per-column paste loop versus a single stretch.
+
+Both renders are compared pixel by pixel before timing them, unencoded,
+so the lossless WebP encoder cannot hide or cause a difference. The color
+of fully transparent pixels is left out, it is never seen.
+
+Usage
+-----
+    python -m benchmarks.achievement [runs]
+"""
+
+import sys
+import timeit
+from io import BytesIO
+
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+from boribay.core.utils.assets import FONT_PATH, IMAGE_PATH
+from boribay.core.utils.manipulation import Manip
+
+TITLE = "Achievement get!"
+TEXT = "Rendered an achievement without blocking the bot"
+
+
+def legacy(title: str, ach: str, colour=(255, 255, 0, 255)):
+    """The renderer as it was, loading sprites and pasting one column at a time."""
+    front = Image.open(f"{IMAGE_PATH}/achievement/achievement.png")
+    txt = Image.new("RGBA", (len(ach) * 15, 64))
+    fnt = ImageFont.truetype(f"{FONT_PATH}/minecraft.ttf", 16)
+    d = ImageDraw.Draw(txt)
+
+    w, h = d.textsize(ach, font=fnt)
+    w = max(320, w)
+
+    mid = Image.new("RGBA", (w + 20, 64), (255, 255, 255, 0))
+
+    midd = Image.open(f"{IMAGE_PATH}/achievement/mid.png")
+    end = Image.open(f"{IMAGE_PATH}/achievement/end.png")
+
+    for i in range(0, w):
+        mid.paste(midd, (i, 0))
+    mid.paste(end, (w, 0))
+
+    txt = Image.new("RGBA", (w + 20, 64), (255, 255, 255, 0))
+
+    d = ImageDraw.Draw(txt)
+    d.text((0, 9), title, font=fnt, fill=colour)
+    d.text((0, 29), ach, font=fnt, fill=(255, 255, 255, 255))
+
+    mid = Image.alpha_composite(mid, txt)
+
+    im = Image.new("RGBA", (w + 80, 64))
+
+    im.paste(front, (0, 0))
+    im.paste(mid, (60, 0))
+
+    buffer = BytesIO()
+    im.save(buffer, "PNG")
+    buffer.seek(0)
+    return buffer
+
+
+current = Manip.achievement.__wrapped__
+
+
+def visible(image: Image.Image) -> Image.Image:
+    image = image.convert("RGBA")
+    mask = image.getchannel("A").point(lambda a: 255 if a else 0)
+    return Image.composite(image, Image.new("RGBA", image.size), mask)
+
+
+def main(runs: int = 200) -> None:
+    before = visible(Image.open(legacy(TITLE, TEXT)))
+    after = visible(Manip.achievement.render(TITLE, TEXT))
+    assert before.size == after.size, (before.size, after.size)
+    assert ImageChops.difference(before, after).getbbox() is None, "outputs differ"
+
+    for name, func in (("before", legacy), ("after", current)):
+        seconds = timeit.timeit(lambda: func(TITLE, TEXT), number=runs)
+        print(f"{name}: {seconds / runs * 1000:7.2f} ms/render")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,62 @@
+"""
+Memory usage of cached rows: plain dicts versus slotted `Row` objects.
+
+The rows mimic `guild_config`, the widest table we keep in memory.
+
+Usage
+-----
+    python -m benchmarks.cache_memory [rows]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from boribay.core.database import make_row
+
+COLUMNS = ("guild_id", "prefix", "welcome_channel", "embed_color", "autorole")
+
+
+def records(count: int):
+    for i in range(count):
+        yield dict(zip(COLUMNS, (10**17 + i, ".", None, 3553598, None)))
+
+
+def as_dicts(count: int) -> dict:
+    cache = {}
+    for record in records(count):
+        d = dict(record)
+        cache[d.pop("guild_id")] = d
+    return cache
+
+
+def as_rows(count: int) -> dict:
+    cache = {}
+    for record in records(count):
+        key, row = make_row(record, "guild_id")
+        cache[key] = row
+    return cache
+
+
+def measure(builder, count: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    cache = builder(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cache
+    return current
+
+
+def main(count: int = 1_000_000) -> None:
+    dicts = measure(as_dicts, count)
+    rows = measure(as_rows, count)
+
+    print(f"{count:,} rows")
+    print(f"dict layout: {dicts / 2**20:8.1f} MiB ({dicts / count:.0f} B/row)")
+    print(f"Row layout:  {rows / 2**20:8.1f} MiB ({rows / count:.0f} B/row)")
+    print(f"saved:       {(dicts - rows) / 2**20:8.1f} MiB ({1 - rows / dicts:.0%})")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,77 @@
+"""
+Encode time and output size of every Manip operation per encoder.
+
+`png-optimize` is how most operations used to save their output.
+
+Usage
+-----
+    python -m benchmarks.encoders [runs]
+"""
+
+import sys
+import timeit
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from boribay.core.utils.encoding import ENCODERS
+from boribay.core.utils.manipulation import Manip
+
+ENCODERS = {"png-optimize": ("png", "png", {"optimize": True}), **ENCODERS}
+
+
+def avatar(size: int = 256) -> BytesIO:
+    y, x = np.mgrid[0:size, 0:size]
+    pixels = np.stack((x * 255 // size, y * 255 // size, (x + y) * 127 // size), -1)
+    buffer = BytesIO()
+    Image.fromarray(pixels.astype(np.uint8), "RGB").save(buffer, "png")
+    return BytesIO(buffer.getvalue())
+
+
+OPERATIONS = {
+    "typeracer": lambda: ("The quick brown fox\njumps over the lazy dog",),
+    "welcome": lambda: ("Member #42", "Dosek just spawned in the server.", avatar()),
+    "pixelate": lambda: (avatar(),),
+    "whyareyougae": lambda: (avatar(128), avatar(128)),
+    "fiveguysonegirl": lambda: (avatar(128), avatar(128)),
+    "wanted": lambda: (avatar(),),
+    "fight": lambda: (avatar(64), avatar(64)),
+    "clyde": lambda: ("Buy a discord nitro!",),
+    "drake": lambda: ("Using MEE6", "Using Boribay"),
+    "jail": lambda: (avatar(),),
+    "press_f": lambda: (avatar(128),),
+    "rainbow": lambda: (avatar(),),
+    "communist": lambda: (avatar(),),
+    "swirl": lambda: (180, avatar()),
+    "achievement": lambda: ("Achievement get!", "Encoded it in no time"),
+}
+
+
+def encode(image: Image.Image, encoder: str) -> bytes:
+    fmt, _, options = ENCODERS[encoder]
+    if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    buffer = BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def main(runs: int = 10) -> None:
+    print(f"{'operation':>16} " + "".join(f"{name:>22}" for name in ENCODERS))
+
+    for name, arguments in OPERATIONS.items():
+        operation = getattr(Manip, name)
+        image = operation.render(*arguments())
+        cells = []
+        for encoder in ENCODERS:
+            size = len(encode(image, encoder))
+            seconds = timeit.timeit(lambda: encode(image, encoder), number=runs)
+            cells.append(f"{seconds / runs * 1000:6.1f} ms {size / 1024:7.1f} KiB")
+
+        print(f"{name:>16} " + "".join(f"{cell:>22}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
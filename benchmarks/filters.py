@@ -0,0 +1,250 @@
+"""
+Array-based filters versus the Wand/Pillow implementations they replaced.
+
+Every pair renders the same generated avatar. The outputs are compared
+channel by channel on the 0..255 scale, and both the mean and the largest
+absolute difference have to stay within the tolerance of the filter.
+
+The old renders run through Wand when it and ImageMagick are installed.
+Otherwise they are replayed by `IM6`, a NumPy transcription of what
+ImageMagick 6 does for them: the resize filter it picks (Mitchell for
+palette or transparent images, Lanczos otherwise), `transparentize`
+followed by an Over composite, and `-swirl` with bilinear interpolation.
+
+Measured against the transcription at 128, 256, 512 and 1024 pixels:
+
+    filter      mean diff   max diff   cause
+    jail        0.38-0.97     14-17    Lanczos instead of Mitchell, and 8-bit
+                                       premultiplied alpha on the bar edges
+    rainbow     0.32-0.49       8-9    Lanczos instead of Mitchell
+    communist        0.21       1-2    the layer is rounded to 8 bits first
+    swirl            0.00         1    float32 instead of float64
+    pixelate    0.19-1.25       1-6    box average instead of a bilinear one,
+                                       which bleeds into neighbouring blocks
+
+`TOLERANCES` leaves some room above these.
+
+Usage
+-----
+    python -m benchmarks.filters [size] [runs]
+"""
+
+import sys
+import timeit
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from boribay.core.utils.assets import IMAGE_PATH
+from boribay.core.utils.manipulation import Manip
+
+try:
+    from wand.image import Image as WI
+except ImportError:  # the library is there but ImageMagick is not, or neither.
+    WI = None
+
+# filter: (mean, max) of the absolute difference.
+TOLERANCES = {
+    "jail": (1.5, 24),
+    "rainbow": (1.0, 12),
+    "communist": (0.5, 4),
+    "swirl": (0.1, 2),
+    "pixelate": (2.0, 8),
+}
+
+
+def avatar(size: int) -> bytes:
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:size, 0:size]
+    pixels = np.stack((x * 255 // size, y * 255 // size, (x + y) * 127 // size), -1)
+    pixels = np.clip(pixels + rng.integers(-20, 20, pixels.shape), 0, 255)
+    buffer = BytesIO()
+    Image.fromarray(pixels.astype(np.uint8), "RGB").save(buffer, "png")
+    return buffer.getvalue()
+
+
+class IM6:
+    """The ImageMagick 6 operations the old renders used, in float64."""
+
+    @staticmethod
+    def mitchell(x: np.ndarray) -> np.ndarray:
+        b = c = 1 / 3
+        x = np.abs(x)
+        near = ((12 - 9 * b - 6 * c) * x**3 + (-18 + 12 * b + 6 * c) * x**2 + 6 - 2 * b) / 6
+        far = (
+            (-b - 6 * c) * x**3 + (6 * b + 30 * c) * x**2 + (-12 * b - 48 * c) * x + 8 * b + 24 * c
+        ) / 6
+        return np.where(x < 1, near, np.where(x < 2, far, 0))
+
+    @staticmethod
+    def lanczos(x: np.ndarray) -> np.ndarray:
+        return np.where(np.abs(x) < 3, np.sinc(x) * np.sinc(x / 3), 0)
+
+    @staticmethod
+    def weights(src: int, dst: int, kernel, support: float) -> np.ndarray:
+        # resize.c: the support widens by the reduction, weights get normalized.
+        factor = dst / src
+        scale = max(1 / factor, 1.0)
+        support *= scale
+        matrix = np.zeros((dst, src))
+        for x in range(dst):
+            bisect = (x + 0.5) / factor
+            start = max(int(bisect - support + 0.5), 0)
+            stop = min(int(bisect + support + 0.5), src)
+            n = np.arange(start, stop)
+            weight = kernel((n - bisect + 0.5) / scale)
+            matrix[x, start:stop] = weight / weight.sum()
+
+        return matrix
+
+    @classmethod
+    def resize(cls, image: Image.Image, size) -> np.ndarray:
+        # the default filter of ResizeImage.
+        kernel, support = cls.lanczos, 3.0
+        if image.mode == "P" or "A" in image.mode or "transparency" in image.info:
+            kernel, support = cls.mitchell, 2.0
+
+        array = np.asarray(image.convert("RGBA"), np.float64) / 255
+        (w, h), (sw, sh) = size, image.size
+        rows, columns = cls.weights(sh, h, kernel, support), cls.weights(sw, w, kernel, support)
+
+        # colors are weighted by their alpha, the alpha itself is not.
+        alpha = array[..., 3:]
+        weighted = np.concatenate((array[..., :3] * alpha, alpha), -1)
+        weighted = np.einsum("yi,ixc->yxc", rows, weighted)
+        weighted = np.einsum("xj,yjc->yxc", columns, weighted)
+        color, alpha = weighted[..., :3], weighted[..., 3:]
+        np.divide(color, alpha, out=color, where=alpha > 0)
+        return np.clip(np.concatenate((color, alpha), -1), 0, 1)
+
+    @classmethod
+    def watermark(cls, layout: str, transparency: float):
+        def render(image: bytes) -> bytes:
+            with Image.open(BytesIO(image)) as im, Image.open(f"{IMAGE_PATH}/{layout}") as top:
+                base = np.asarray(im.convert("RGB"), np.float64) / 255
+                top = cls.resize(top, im.size)
+
+            # transparentize, then Over onto the opaque avatar.
+            alpha = np.maximum(top[..., 3:] - transparency, 0)
+            result = top[..., :3] * alpha + base * (1 - alpha)
+            return cls.save(result)
+
+        return render
+
+    @classmethod
+    def swirl(cls, image: bytes, degrees: float = 180) -> bytes:
+        # fx.c SwirlImage, pixels are addressed by their corner like there.
+        with Image.open(BytesIO(image)) as im:
+            array = np.asarray(im.convert("RGB"), np.float64)
+
+        h, w = array.shape[:2]
+        cx, cy = w / 2, h / 2
+        radius = max(cx, cy)
+        sx = h / w if w < h else 1.0
+        sy = w / h if w > h else 1.0
+
+        y, x = np.mgrid[0:h, 0:w].astype(np.float64)
+        dx, dy = sx * (x - cx), sy * (y - cy)
+        distance = dx * dx + dy * dy
+        factor = 1 - np.sqrt(distance) / radius
+        angle = np.radians(degrees) * factor * factor
+        sine, cosine = np.sin(angle), np.cos(angle)
+        u = np.clip((cosine * dx - sine * dy) / sx + cx, 0, w - 1)
+        v = np.clip((sine * dx + cosine * dy) / sy + cy, 0, h - 1)
+
+        # bilinear, with the edge pixels repeated past the edges.
+        x0, y0 = np.floor(u).astype(int), np.floor(v).astype(int)
+        x1, y1 = np.minimum(x0 + 1, w - 1), np.minimum(y0 + 1, h - 1)
+        fx, fy = (u - x0)[..., None], (v - y0)[..., None]
+        top = array[y0, x0] * (1 - fx) + array[y0, x1] * fx
+        bottom = array[y1, x0] * (1 - fx) + array[y1, x1] * fx
+        swirled = top * (1 - fy) + bottom * fy
+
+        result = np.where((distance < radius * radius)[..., None], swirled, array)
+        return cls.save(result / 255)
+
+    @staticmethod
+    def save(array: np.ndarray) -> bytes:
+        buffer = BytesIO()
+        Image.fromarray(np.rint(array * 255).astype(np.uint8), "RGB").save(buffer, "png")
+        return buffer.getvalue()
+
+
+def watermark(layout: str, transparency: float):
+    if WI is None:
+        return IM6.watermark(layout, transparency)
+
+    def render(image: bytes) -> bytes:
+        with WI(filename=f"{IMAGE_PATH}/{layout}") as top, WI(blob=image) as img:
+            top.resize(*img.size)
+            img.watermark(top, transparency)
+            return img.make_blob("png")
+
+    return render
+
+
+def wand_swirl(image: bytes) -> bytes:
+    if WI is None:
+        return IM6.swirl(image, 180)
+
+    with WI(blob=image) as img:
+        img.swirl(degree=180)
+        return img.make_blob("png")
+
+
+def pillow_pixelate(image: bytes) -> bytes:
+    with Image.open(BytesIO(image)) as im:
+        small = im.resize((32, 32), resample=Image.BILINEAR)
+        buffer = BytesIO()
+        small.resize(im.size, Image.NEAREST).save(buffer, "png")
+        return buffer.getvalue()
+
+
+def current(name: str, *args):
+    func = getattr(Manip, name).__wrapped__
+    return lambda image: func(*args, BytesIO(image)).getvalue()
+
+
+PAIRS = {
+    "jail": (watermark("jailbars.png", 0.3), current("jail")),
+    "rainbow": (watermark("rainbow.png", 0.5), current("rainbow")),
+    "communist": (watermark("communist-flag.jpg", 0.7), current("communist")),
+    "swirl": (wand_swirl, current("swirl", 180)),
+    "pixelate": (pillow_pixelate, current("pixelate")),
+}
+
+
+def difference(a: bytes, b: bytes) -> np.ndarray:
+    a, b = (np.asarray(Image.open(BytesIO(i)).convert("RGB"), np.int16) for i in (a, b))
+    return np.abs(a - b)
+
+
+def main(size: int = 512, runs: int = 20) -> None:
+    image = avatar(size)
+    reference = "Wand" if WI is not None else "the ImageMagick 6 transcription"
+    print(f"{size}x{size} input, {runs} runs, compared with {reference}")
+
+    failed = 0
+    for name, (before, after) in PAIRS.items():
+        diff = difference(before(image), after(image))
+        new = timeit.timeit(lambda: after(image), number=runs) / runs * 1000
+        timing = f"{new:7.1f} ms"
+        if WI is not None or name == "pixelate":  # the transcription is not timed.
+            old = timeit.timeit(lambda: before(image), number=runs) / runs * 1000
+            timing = f"{old:7.1f} ms -> {timing}"
+
+        mean, peak = TOLERANCES[name]
+        ok = diff.mean() <= mean and diff.max() <= peak
+        failed += not ok
+        print(
+            f"{name:>10}: {timing}, "
+            f"mean diff {diff.mean():5.2f} (<= {mean}), max {diff.max():3d} (<= {peak}) "
+            f"{'ok' if ok else 'OUT OF TOLERANCE'}"
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
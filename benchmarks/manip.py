@@ -0,0 +1,187 @@
+"""
+Latency, peak memory and output size of every Manip operation.
+
+Every operation runs in its own subprocess, so its peak RSS is not mixed
+up with the others. Inputs are generated and templates come from
+`data/layouts`, so it runs offline. Run it from the repository root.
+
+Usage
+-----
+    python -m benchmarks.manip run [--runs N] [--sizes 128,512] [--output FILE] [op ...]
+    python -m benchmarks.manip compare BASELINE.json RESULTS.json [--threshold 10]
+"""
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import numpy as np
+import PIL
+
+from boribay.core.utils.manipulation import Manip
+
+from .encoders import avatar
+
+SIZES = (128, 256, 512, 1024)
+
+# Operations that take images get one at the benchmarked size,
+# the others are benchmarked once.
+OPERATIONS = {
+    "typeracer": (False, lambda _: ("The quick brown fox\njumps over the lazy dog",)),
+    "welcome": (True, lambda s: ("Member #42", "Dosek just joined.", avatar(s))),
+    "pixelate": (True, lambda s: (avatar(s),)),
+    "whyareyougae": (True, lambda s: (avatar(s), avatar(s))),
+    "fiveguysonegirl": (True, lambda s: (avatar(s), avatar(s))),
+    "wanted": (True, lambda s: (avatar(s),)),
+    "fight": (True, lambda s: (avatar(s), avatar(s))),
+    "clyde": (False, lambda _: ("Buy a discord nitro!",)),
+    "drake": (False, lambda _: ("Using MEE6", "Using Boribay")),
+    "jail": (True, lambda s: (avatar(s),)),
+    "press_f": (True, lambda s: (avatar(s),)),
+    "rainbow": (True, lambda s: (avatar(s),)),
+    "communist": (True, lambda s: (avatar(s),)),
+    "swirl": (True, lambda s: (180, avatar(s))),
+    "achievement": (False, lambda _: ("Achievement get!", "Benchmarked it")),
+    "triggered": (True, lambda s: (avatar(s),)),
+    "ascii": (True, lambda s: (avatar(s),)),
+}
+
+# Lower is better for all of them.
+METRICS = ("p50", "p95", "peak_rss", "bytes")
+
+
+def measure(name: str, size: int, runs: int) -> dict:
+    """Time an operation in this process, encoding included."""
+    _, arguments = OPERATIONS[name]
+    operation = getattr(Manip, name).__wrapped__  # skips the executor.
+    output = operation(*arguments(size))  # loads the templates first.
+
+    timings = []
+    for _ in range(runs):
+        args = arguments(size)
+        start = time.perf_counter()
+        operation(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "p50": float(np.percentile(timings, 50)),
+        "p95": float(np.percentile(timings, 95)),
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "bytes": len(output.getvalue()),
+    }
+
+
+def spawn(name: str, size: int, runs: int) -> dict:
+    process = subprocess.run(
+        [sys.executable, "-m", "benchmarks.manip", "worker", name, str(size), str(runs)],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(process.stdout)
+
+
+def commit() -> Optional[str]:
+    try:
+        process = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        )
+    except OSError:
+        return None
+
+    return process.stdout.strip() or None
+
+
+def run(args) -> None:
+    sizes = [int(size) for size in args.sizes.split(",")]
+    if unknown := set(args.operations) - set(OPERATIONS):
+        sys.exit(f"Unknown operations: {', '.join(sorted(unknown))}")
+
+    results = {}
+
+    print(f"{'operation':>24} {'p50':>10} {'p95':>10} {'peak RSS':>12} {'output':>12}")
+    for name in args.operations or OPERATIONS:
+        takes_images, _ = OPERATIONS[name]
+        for size in sizes if takes_images else sizes[:1]:
+            key = f"{name}@{size}" if takes_images else name
+            result = results[key] = spawn(name, size, args.runs)
+            print(
+                f"{key:>24} {result['p50']:7.1f} ms {result['p95']:7.1f} ms "
+                f"{result['peak_rss'] / 1024:8.1f} MiB {result['bytes'] / 1024:8.1f} KiB"
+            )
+
+    if args.output:
+        report = {
+            "commit": commit(),
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "runs": args.runs,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+def compare(args) -> None:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.results) as f:
+        results = json.load(f)
+
+    print(f"{baseline['commit']} -> {results['commit']}\n")
+    print(f"{'operation':>24}" + "".join(f"{key:>12}" for key in METRICS))
+
+    regressions = 0
+    for key, new in results["results"].items():
+        if (old := baseline["results"].get(key)) is None:
+            continue
+
+        cells = []
+        for metric in METRICS:
+            change = (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0
+            flag = "!" if change > args.threshold else " "
+            regressions += flag == "!"
+            cells.append(f"{change:+9.1f}%{flag}")
+
+        print(f"{key:>24}" + "".join(f"{cell:>12}" for cell in cells))
+
+    print(f"\n{regressions} metric(s) over the {args.threshold}% threshold.")
+    sys.exit(1 if regressions else 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.manip")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_run = commands.add_parser("run", help="benchmark the operations")
+    parser_run.add_argument("operations", nargs="*", help="all of them by default")
+    parser_run.add_argument("--runs", type=int, default=20)
+    parser_run.add_argument("--sizes", default=",".join(map(str, SIZES)))
+    parser_run.add_argument("--output", help="where to save the results as JSON")
+    parser_run.set_defaults(func=run)
+
+    parser_compare = commands.add_parser("compare", help="compare two results")
+    parser_compare.add_argument("baseline")
+    parser_compare.add_argument("results")
+    parser_compare.add_argument("--threshold", type=float, default=10.0)
+    parser_compare.set_defaults(func=compare)
+
+    parser_worker = commands.add_parser("worker")
+    parser_worker.add_argument("operation", choices=OPERATIONS)
+    parser_worker.add_argument("size", type=int)
+    parser_worker.add_argument("runs", type=int)
+    parser_worker.set_defaults(
+        func=lambda args: print(json.dumps(measure(args.operation, args.size, args.runs)))
+    )
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
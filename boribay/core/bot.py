@@ -12,10 +12,39 @@ import asyncpg
 import discord
 from discord.ext import commands
 
-from boribay.settings import DEVELOPMENT
-from .database import Cache, DatabaseManager
+from boribay.settings import (
+    ASSET_CACHE_MAX_BYTES,
+    ASSET_CACHE_TTL,
+    AUTOROLE_RATE,
+    DEVELOPMENT,
+    RENDER_CACHE_DIR,
+    RENDER_CACHE_DISK_MAX_BYTES,
+    RENDER_CACHE_MAX_BYTES,
+    RENDER_MAX_WAITING,
+    RENDER_OVERLOAD,
+    RENDER_QUEUE_SIZE,
+    RENDER_WORKERS,
+    STATS_FLUSH_INTERVAL,
+    STATS_MAX_PENDING,
+    USER_CACHE_MAX_BYTES,
+    USER_CACHE_MAX_ENTRIES,
+    WELCOME_BATCH_WINDOW,
+    WELCOME_CONCURRENCY,
+)
+from .database import Cache, CacheListener, DatabaseManager, LRUCache, StatsWriter
 from .events import set_events
-from .utils import Context, is_blacklisted
+from .leaderboard import Leaderboard
+from .migrations import check_query_plans, migrate
+from .utils import (
+    AssetFetcher,
+    Context,
+    RenderCache,
+    assets,
+    is_blacklisted,
+    renderer,
+)
+from .utils.encoding import check_encoding
+from .welcome import AutoroleQueue, WelcomeQueue
 
 __all__ = ("Boribay",)
 
@@ -144,15 +173,61 @@ class Boribay(commands.Bot):
     async def close(self) -> None:
         await super().close()
         await self.session.close()
+        await self.stats.close()
+        await self.cache_listener.close()
+        await renderer.close()
+        self.welcomer.close()
+        self.autoroles.close()
 
     async def setup(self):
+        check_encoding()  # before anything gets rendered with it.
+
         # Data-related.
         self.pool = await asyncpg.create_pool("postgresql://postgres:@localhost:6543/postgres")
+        await migrate(self.pool)
         self.db = DatabaseManager(self)
         self.guild_cache = await Cache(
             "SELECT * FROM guild_config", "guild_id", self.pool
         )
-        self.user_cache = await Cache("SELECT * FROM users", "user_id", self.pool)
+        self.user_cache = await LRUCache(
+            "SELECT * FROM users",
+            "user_id",
+            self.pool,
+            max_entries=USER_CACHE_MAX_ENTRIES,
+            max_bytes=USER_CACHE_MAX_BYTES,
+        )
+        self.leaderboard = await Leaderboard(self.pool)
+        self.cache_listener = CacheListener(self.pool)
+        self.cache_listener.subscribe("guild_config", self.guild_cache)
+        self.cache_listener.subscribe("users", self.user_cache)
+        self.cache_listener.subscribe("users", self.leaderboard)
+        await self.cache_listener.start()
+        self.stats = StatsWriter(
+            self.pool,
+            self.counter,
+            interval=STATS_FLUSH_INTERVAL,
+            max_pending=STATS_MAX_PENDING,
+        )
+        self.stats.start()
+
+        # Image templates used by the Manip class and the avatars fed to it.
+        self.fetcher = AssetFetcher(max_bytes=ASSET_CACHE_MAX_BYTES, ttl=ASSET_CACHE_TTL)
+        await asyncio.to_thread(assets.preload)
+        renderer.cache = RenderCache(
+            max_bytes=RENDER_CACHE_MAX_BYTES,
+            directory=RENDER_CACHE_DIR,
+            max_disk_bytes=RENDER_CACHE_DISK_MAX_BYTES,
+        )
+        await renderer.start(
+            workers=RENDER_WORKERS,
+            queue_size=RENDER_QUEUE_SIZE,
+            overload=RENDER_OVERLOAD,
+            max_waiting=RENDER_MAX_WAITING,
+        )
+        self.welcomer = WelcomeQueue(
+            self, window=WELCOME_BATCH_WINDOW, concurrency=WELCOME_CONCURRENCY
+        )
+        self.autoroles = AutoroleQueue(rate=AUTOROLE_RATE)
 
         # Checks to limit certain things.
         self.add_check(is_blacklisted)
@@ -163,6 +238,7 @@ class Boribay(commands.Bot):
         # Check for flags.
         if self.cli.developer or DEVELOPMENT:
             logger.info("Developer mode enabled.")
+            await check_query_plans(self.pool)
             await self.load_extension("boribay.core.cog_manager")
             await self.load_extension("boribay.core.developer")
 
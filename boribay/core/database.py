@@ -1,9 +1,107 @@
-from collections import defaultdict
-from typing import Union
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections import Counter, OrderedDict, defaultdict
+from collections.abc import MutableMapping
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 import discord
+from asyncpg import Record
 from asyncpg.pool import Pool
 
+from .exceptions import NotEnough
+
+logger = logging.getLogger("bot.database")
+
+
+class Row(MutableMapping):
+    """The base of compact cached rows.
+
+    Subclasses are made by `record_class` and keep one slot per column,
+    so a row costs no per-instance dict and column names are stored once
+    per table instead of once per row. Mapping-style reads and writes,
+    e.g `row["prefix"]` or `row.get("bio")`, keep working as with dicts.
+
+    This class inherits from `collections.abc.MutableMapping`.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *values: Any):
+        for column, value in zip(self.__slots__, values):
+            setattr(self, column, value)
+
+    def __getitem__(self, column: str) -> Any:
+        if column not in self.__slots__:
+            raise KeyError(column)
+
+        return getattr(self, column)
+
+    def __setitem__(self, column: str, value: Any) -> None:
+        if column not in self.__slots__:
+            raise KeyError(column)
+
+        setattr(self, column, value)
+
+    def __delitem__(self, column: str) -> None:
+        raise TypeError("Columns of a cached row cannot be deleted.")
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+@lru_cache(maxsize=None)
+def record_class(columns: Tuple[str, ...]) -> type:
+    """Make (or reuse) a slotted `Row` subclass for the given columns.
+
+    Parameters
+    ----------
+    columns : Tuple[str, ...]
+        The column names, in the order the query returns them.
+
+    Returns
+    -------
+    type
+        The `Row` subclass to build cached rows with.
+
+    Raises
+    ------
+    ValueError
+        If a column name shadows one of the mapping methods.
+    """
+    if clashes := set(columns) & set(dir(Row)):
+        raise ValueError(f"Columns shadow mapping methods: {', '.join(clashes)}")
+
+    return type("Row", (Row,), {"__slots__": columns})
+
+
+def make_row(record, key: str) -> Tuple[Any, Row]:
+    """Turn a database record into its key and a compact `Row`.
+
+    Parameters
+    ----------
+    record : asyncpg.Record
+        The record to convert.
+    key : str
+        The name of the key column, it is not stored in the row.
+
+    Returns
+    -------
+    Tuple[Any, Row]
+        The key value and the row built from the other columns.
+    """
+    columns = tuple(c for c in record.keys() if c != key)
+    return record[key], record_class(columns)(*(record[c] for c in columns))
+
 
 class Cache(defaultdict):
     """Cache loader for Boribay created in order to use less DB calls.
@@ -27,17 +125,488 @@ class Cache(defaultdict):
         records = await self.db.fetch(self.query)
 
         for record in records:
-            d = dict(record)
-            self[d.pop(self.key)] = d
+            self.upsert(record)
 
         return self
 
     async def refresh(self):
-        """Refresh cache method."""
+        """Refresh cache method.
+
+        This re-runs the whole query, so only call it when a full reload
+        was explicitly asked for. Writes should use `upsert`/`patch`/`evict`.
+        """
         self.clear()
         await self.cache_db()
         return self
 
+    def upsert(self, record) -> Row:
+        """Insert or replace a single cached row.
+
+        Parameters
+        ----------
+        record : asyncpg.Record
+            A full row, usually the one a write gave back via `RETURNING *`.
+
+        Returns
+        -------
+        Row
+            The cached row without its key column.
+        """
+        key, row = make_row(record, self.key)
+        self[key] = row
+        return row
+
+    def patch(self, key: int, **values) -> None:
+        """Update some columns of an already cached row.
+
+        Nothing happens if the row is not cached, we never make up rows.
+
+        Parameters
+        ----------
+        key : int
+            The key of the row to patch, e.g the guild ID.
+        """
+        if key in self:
+            self[key].update(values)
+
+    def evict(self, key: int) -> None:
+        """Drop a single row from the cache.
+
+        Parameters
+        ----------
+        key : int
+            The key of the row to drop.
+        """
+        self.pop(key, None)
+
+    def apply(self, op: str, record: dict) -> None:
+        """Apply a change notified by `CacheListener`.
+
+        Parameters
+        ----------
+        op : str
+            The operation, one of `INSERT`, `UPDATE` or `DELETE`.
+        record : dict
+            The full changed row.
+        """
+        if op == "DELETE":
+            return self.evict(record[self.key])
+
+        self.upsert(record)
+
+    async def fetch(self, key: int) -> Optional[Row]:
+        """Get a cached row without inserting an empty one.
+
+        Parameters
+        ----------
+        key : int
+            The key of the row to get.
+
+        Returns
+        -------
+        Optional[Row]
+            The row, `None` if there is no such row.
+        """
+        return self.get(key)
+
+
+def _sizeof(row: Optional[Row]) -> int:
+    """Roughly estimate how many bytes a cached row takes."""
+    if row is None:
+        return sys.getsizeof(row)
+
+    return sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values())
+
+
+class LRUCache(OrderedDict):
+    """Lazily populated, bounded version of `Cache`.
+
+    Nothing is loaded up front. A row gets fetched on its first lookup
+    (concurrent lookups of the same key share one query) and the least
+    recently used rows are dropped once the entry or byte budget is exceeded.
+
+    Rows that do not exist are remembered as `None`, so unregistered users
+    do not cost a query per command, but no placeholder rows are made up.
+
+    This class inherits from `collections.OrderedDict`.
+    """
+
+    def __init__(
+        self,
+        query: str,
+        key: str,
+        db: Pool,
+        *,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        super().__init__()
+        self.query = query
+        self.key = key
+        self.db = db
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._written: Set[int] = set()  # keys written while being fetched.
+
+    def __await__(self):  # await LRUCache(... - kept for parity with Cache.
+        async def _self():
+            return self
+
+        return _self().__await__()
+
+    def __repr__(self) -> str:
+        return (
+            f"<LRUCache entries={len(self)} size={self.size} "
+            f"hits={self.hits} misses={self.misses} evictions={self.evictions}>"
+        )
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """The counters of this cache, handy for debugging commands."""
+        return {
+            "entries": len(self),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _store(self, key: int, row: Optional[Row]) -> None:
+        if key in self._pending:
+            self._written.add(key)
+
+        if key in self:
+            self.size -= _sizeof(self[key])
+
+        self[key] = row
+        self.move_to_end(key)
+        self.size += _sizeof(row)
+        self._trim()
+
+    def _over_budget(self) -> bool:
+        if self.max_entries is not None and len(self) > self.max_entries:
+            return True
+
+        return self.max_bytes is not None and self.size > self.max_bytes
+
+    def _trim(self) -> None:
+        while self and self._over_budget():
+            _, dropped = self.popitem(last=False)
+            self.size -= _sizeof(dropped)
+            self.evictions += 1
+
+    async def _load(self, key: int) -> Optional[Row]:
+        # a write that lands while the query runs may be newer than its
+        # result, which then gets thrown away and queried again.
+        query = f"{self.query} WHERE {self.key} = $1"
+        self._written.discard(key)
+        while True:
+            record = await self.db.fetchrow(query, key)
+            if key not in self._written:
+                break
+
+            self._written.discard(key)
+
+        if record is None:
+            self._store(key, None)
+            row = None
+        else:
+            row = self.upsert(record)
+
+        self._written.discard(key)  # storing the result counts as a write too.
+        return row
+
+    async def fetch(self, key: int) -> Optional[Row]:
+        """Get a row, querying the database only on a cache miss.
+
+        Parameters
+        ----------
+        key : int
+            The key of the row to get.
+
+        Returns
+        -------
+        Optional[Row]
+            The row, `None` if there is no such row.
+        """
+        if key in self:
+            self.hits += 1
+            self.move_to_end(key)
+            return self[key]
+
+        if (future := self._pending.get(key)) is None:
+            self.misses += 1
+            future = self._pending[key] = asyncio.ensure_future(self._load(key))
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+
+        return await asyncio.shield(future)
+
+    def upsert(self, record) -> Row:
+        """Insert or replace a single cached row.
+
+        Parameters
+        ----------
+        record : asyncpg.Record
+            A full row, usually the one a write gave back via `RETURNING *`.
+
+        Returns
+        -------
+        Row
+            The cached row without its key column.
+        """
+        key, row = make_row(record, self.key)
+        self._store(key, row)
+        return row
+
+    def patch(self, key: int, **values) -> None:
+        """Update some columns of an already cached row.
+
+        Parameters
+        ----------
+        key : int
+            The key of the row to patch.
+        """
+        if key in self._pending:
+            self._written.add(key)
+
+        if (row := self.get(key)) is not None:
+            before = _sizeof(row)
+            row.update(values)
+            self.size += _sizeof(row) - before
+            self._trim()
+
+    def evict(self, key: int) -> None:
+        """Drop a single row from the cache.
+
+        Parameters
+        ----------
+        key : int
+            The key of the row to drop.
+        """
+        if key in self._pending:
+            self._written.add(key)
+
+        if key in self:
+            self.size -= _sizeof(self.pop(key))
+
+    def apply(self, op: str, record: dict) -> None:
+        """Apply a change notified by `CacheListener`.
+
+        Only rows that are already cached get touched, others will be
+        fetched fresh on their next lookup anyway.
+
+        Parameters
+        ----------
+        op : str
+            The operation, one of `INSERT`, `UPDATE` or `DELETE`.
+        record : dict
+            The full changed row.
+        """
+        if op == "DELETE":
+            return self.evict(record[self.key])
+
+        if record[self.key] in self:
+            self.upsert(record)
+
+    async def refresh(self):
+        """Forget every cached row, they get lazily fetched again."""
+        self.clear()
+        self.size = 0
+        return self
+
+
+class CacheListener:
+    """Keeps caches of several bot processes in sync.
+
+    The `notify_cache` trigger (see `data/migrations`) sends every changed
+    row of the cached tables over the `cache` channel. This class listens
+    on that channel with a dedicated connection and hands each change to
+    the caches subscribed to its table, so only that entry gets patched.
+    """
+
+    channel = "cache"
+
+    def __init__(self, pool: Pool):
+        self.pool = pool
+        self.connection = None
+        self.subscribers: Dict[str, List[Union[Cache, LRUCache]]] = defaultdict(list)
+
+    def subscribe(self, table: str, cache: Union[Cache, LRUCache]) -> None:
+        """Start patching the cache on changes of the table.
+
+        Parameters
+        ----------
+        table : str
+            The table the cache was loaded from.
+        cache : Union[Cache, LRUCache]
+            Anything with an `apply(op, record)` method.
+        """
+        self.subscribers[table].append(cache)
+
+    def unsubscribe(self, table: str, cache: Union[Cache, LRUCache]) -> None:
+        """Stop patching the cache, e.g when its cog gets unloaded.
+
+        Parameters
+        ----------
+        table : str
+            The table the cache was subscribed to.
+        cache : Union[Cache, LRUCache]
+            The cache to unsubscribe.
+        """
+        if cache in self.subscribers[table]:
+            self.subscribers[table].remove(cache)
+
+    async def start(self) -> None:
+        """Acquire the listening connection and start receiving changes."""
+        self.connection = await self.pool.acquire()
+        self.connection.add_termination_listener(self._on_termination)
+        await self.connection.add_listener(self.channel, self._on_notification)
+
+    async def close(self) -> None:
+        """Stop listening and give the connection back to the pool."""
+        if self.connection is None:
+            return
+
+        connection, self.connection = self.connection, None
+        connection.remove_termination_listener(self._on_termination)
+        await connection.remove_listener(self.channel, self._on_notification)
+        await self.pool.release(connection)
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str):
+        data = json.loads(payload)
+
+        for cache in self.subscribers.get(data["table"], ()):
+            try:
+                cache.apply(data["op"], data["row"])
+            except Exception:
+                logger.exception(f"Could not apply a change of {data['table']}.")
+
+    def _on_termination(self, connection) -> None:
+        # Notifications sent while we were away are lost, so this is
+        # the only case where subscribed caches get fully reloaded.
+        logger.warning("Cache listener connection was lost, reconnecting.")
+        self.connection = None
+        asyncio.get_event_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        await self.start()
+
+        for caches in self.subscribers.values():
+            for cache in caches:
+                await cache.refresh()
+
+
+class StatsWriter:
+    """Write-behind buffer for the `bot_stats` counters.
+
+    Increments are collected in `bot.counter` and written to the database
+    in one `UPDATE` either every `interval` seconds or as soon as
+    `max_pending` increments were collected, whichever comes first.
+
+    Only one flush runs at a time, and after a failed one, early flushes
+    back off exponentially (up to `interval`) while the periodic one keeps
+    retrying. A crash loses the pending increments, at most about
+    `max_pending` while the database is reachable, but everything since the
+    last successful flush while it is not.
+    """
+
+    def __init__(
+        self, pool: Pool, counter: Counter, *, interval: float, max_pending: int
+    ):
+        self.pool = pool
+        self.counter = counter
+        self.interval = interval
+        self.max_pending = max_pending
+
+        self.flushed = Counter()
+        self.failures = 0
+        self._retry_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> Counter:
+        """Increments that were not written to the database yet."""
+        return self.counter - self.flushed
+
+    def start(self) -> None:
+        """Start flushing the counters periodically."""
+        self._task = asyncio.get_event_loop().create_task(self._loop())
+
+    def record(self, key: str, amount: int = 1) -> None:
+        """Count something and flush if too many increments are pending.
+
+        Parameters
+        ----------
+        key : str
+            The column of `bot_stats` to increment, e.g `command_usage`.
+        amount : int, optional
+            How much to add, by default 1
+        """
+        self.counter[key] += amount
+
+        if self._flushing is not None or self._lock.locked():
+            return
+
+        if time.monotonic() < self._retry_at:
+            return
+
+        if sum(self.pending.values()) >= self.max_pending:
+            self._flushing = asyncio.get_event_loop().create_task(self.flush())
+            self._flushing.add_done_callback(self._flushed)
+
+    def _flushed(self, _) -> None:
+        self._flushing = None
+
+    async def flush(self) -> None:
+        """Write every pending increment in one query."""
+        async with self._lock:
+            if not (pending := self.pending):
+                return
+
+            columns = list(pending)
+            query = "UPDATE bot_stats SET " + ", ".join(
+                f"{column} = {column} + ${i}" for i, column in enumerate(columns, 1)
+            )
+            try:
+                await self.pool.execute(query, *(pending[c] for c in columns))
+            except Exception as e:
+                self.failures += 1
+                delay = min(2**self.failures, self.interval)
+                self._retry_at = time.monotonic() + delay
+                if self.failures == 1:
+                    logger.exception("Could not flush the bot stats.")
+                else:
+                    logger.warning(
+                        f"Could not flush the bot stats ({self.failures} times "
+                        f"in a row): {e!r}"
+                    )
+                return
+
+            self.failures = 0
+            self._retry_at = 0.0
+            self.flushed.update(pending)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def close(self) -> None:
+        """Stop the periodic flushing and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        await self.flush()
+
 
 class DatabaseManager(Pool):
     """Database manager for Boribay created in order to ease up manipulation.
@@ -63,12 +632,13 @@ class DatabaseManager(Pool):
         Returns:
             None: Means that the method returns nothing.
         """
-        await self.pool.execute(
-            f'UPDATE "users" SET "{column}" = "{column}" {op} $1 WHERE "user_id" = $2;',
+        row = await self.pool.fetchrow(
+            f'UPDATE "users" SET "{column}" = "{column}" {op} $1 '
+            'WHERE "user_id" = $2 RETURNING *;',
             amount,
             user.id,
         )
-        await self.bot.user_cache.refresh()
+        self._store(row)
 
     async def add(self, *args) -> None:
         """Database Manager add method to ease up mostly Economics manipulation.
@@ -96,21 +666,42 @@ class DatabaseManager(Pool):
         """
         await self._operate("-", *args)
 
+    def _store(self, row) -> None:
+        """Put a row returned by a write into the user cache.
+
+        Parameters
+        ----------
+        row : Optional[asyncpg.Record]
+            The updated row, `None` if the write matched nothing.
+        """
+        if row is not None:
+            self.bot.user_cache.upsert(row)
+            self.bot.leaderboard.upsert(row)
+
     async def push(self, query: str, *args, **kwargs):
         """Just a method to save up 1 line in the code.
 
+        The query has to end with `RETURNING *` so that the written row
+        could be patched into the user cache without reloading it.
+
         Parameters
         ----------
         query : str
             A query to get executed.
         """
-        await self.pool.execute(query, *args, **kwargs)
-        await self.bot.user_cache.refresh()
+        row = await self.pool.fetchrow(query, *args, **kwargs)
+        self._store(row)
+        return row
 
     async def double(
         self, choice: str, amount: int, reducer: discord.Member, adder: discord.Member
-    ) -> None:
-        """The "double" method to ease up database manipulation.
+    ) -> Tuple[Record, Record]:
+        """Atomically move money from one user to another.
+
+        Debit, credit and the balance check are done by a single statement:
+        both rows get locked in `user_id` order first, so concurrent
+        transfers touching the same users queue up on those two rows only
+        and can never deadlock each other.
 
         Args:
             choice (str): The column value.
@@ -118,15 +709,69 @@ class DatabaseManager(Pool):
             reducer (discord.Member): The user the money will be taken from.
             adder (discord.Member): The user the money will be added to.
 
+        Raises:
+            NotEnough: If the reducer cannot afford it (or a user is missing),
+            in this case nothing gets changed.
+
         Returns:
-            None: Means that the method returns nothing.
+            Tuple[Record, Record]: The updated rows of the reducer and the adder.
         """
-        reducer_query = f"UPDATE users SET {choice} = {choice} - $1 WHERE user_id = $2"
-        adder_query = f"UPDATE users SET {choice} = {choice} + $1 WHERE user_id = $2"
+        query = f"""
+        WITH locked AS (
+            SELECT user_id, {choice} FROM users
+            WHERE user_id = ANY($2::bigint[])
+            ORDER BY user_id
+            FOR UPDATE
+        )
+        UPDATE users
+        SET {choice} = users.{choice}
+            + CASE WHEN users.user_id = $3 THEN -$1 ELSE $1 END
+        FROM locked
+        WHERE users.user_id = locked.user_id
+            AND (SELECT count(*) FROM locked) = 2
+            AND (SELECT {choice} FROM locked WHERE user_id = $3) >= $1
+        RETURNING users.*
+        """
+        rows = {
+            row["user_id"]: row
+            for row in await self.pool.fetch(
+                query, amount, [reducer.id, adder.id], reducer.id
+            )
+        }
+        if len(rows) != 2:
+            raise NotEnough(amount)
+
+        for row in rows.values():
+            self._store(row)
+
+        return rows[reducer.id], rows[adder.id]
+
+    async def settle(self, user: discord.Member, stake: int, delta: int) -> Record:
+        """Settle a bet, checking the balance as part of the write itself.
 
-        await self.pool.execute(reducer_query, amount, reducer.id)
-        await self.pool.execute(adder_query, amount, adder.id)
-        await self.bot.user_cache.refresh()
+        This lets casino games trust a cached balance: if it was stale,
+        the write simply matches nothing and the bet is refused.
+
+        Args:
+            user (discord.Member): The player.
+            stake (int): The bet, the wallet must still hold this much.
+            delta (int): How much to add to the wallet, negative on a loss.
+
+        Raises:
+            NotEnough: If the wallet holds less than the stake.
+
+        Returns:
+            Record: The updated row of the player.
+        """
+        query = """
+        UPDATE users SET wallet = wallet + $1
+        WHERE user_id = $2 AND wallet >= $3
+        RETURNING *
+        """
+        if (row := await self.push(query, delta, user.id, stake)) is None:
+            raise NotEnough(stake)
+
+        return row
 
     async def set(
         self, table: str, column: str, user: discord.Member, value: str
@@ -143,6 +788,13 @@ class DatabaseManager(Pool):
             None: Means that the method returns nothing.
         """
         dirs = {"users": "user", "guild_config": "guild"}
-        query = f'UPDATE "{table}" SET "{column}" = $1 WHERE "{dirs[table]}_id" = $2'
-        await self.pool.execute(query, value, user.id)
-        await self.bot.user_cache.refresh()
+        caches = {"users": self.bot.user_cache, "guild_config": self.bot.guild_cache}
+        query = (
+            f'UPDATE "{table}" SET "{column}" = $1 '
+            f'WHERE "{dirs[table]}_id" = $2 RETURNING *'
+        )
+        row = await self.pool.fetchrow(query, value, user.id)
+        if row is not None and table == "users":
+            self._store(row)
+        elif row is not None:
+            caches[table].upsert(row)
@@ -1,3 +1,4 @@
+import asyncio
 import copy
 import inspect
 import os.path
@@ -11,6 +12,7 @@ from discord.ext import commands
 from jishaku.codeblocks import codeblock_converter
 
 from boribay.core import utils
+from boribay.core.migrations import check_query_plans
 
 from .formats import TabularData
 from .utils import IdeaPageSource
@@ -79,15 +81,14 @@ class Developer(utils.Cog):
         Args:
             users (commands.Greedy[discord.Member]): Blacklist several users.
         """
-        query = "UPDATE users SET blacklisted = true WHERE user_id = $1"
+        query = "UPDATE users SET blacklisted = true WHERE user_id = $1 RETURNING *"
 
         for user in users:
-            await ctx.bot.pool.execute(query, user.id)
+            await ctx.db.push(query, user.id)
 
         await ctx.send(
             f'✅ Successfully put **{", ".join(str(x) for x in users)}** into blacklist.'
         )
-        await ctx.user_cache.refresh()
 
     @blacklist.command(name="remove")
     async def _blacklist_remove(
@@ -103,15 +104,14 @@ class Developer(utils.Cog):
         Args:
             users (commands.Greedy[discord.Member]): Unblacklist several users.
         """
-        query = "UPDATE users SET blacklisted = false WHERE user_id = $1"
+        query = "UPDATE users SET blacklisted = false WHERE user_id = $1 RETURNING *"
 
         for user in users:
-            await ctx.bot.pool.execute(query, user.id)
+            await ctx.db.push(query, user.id)
 
         await ctx.send(
             f'✅ Successfully removed **{", ".join(str(x) for x in users)}** from blacklist.'
         )
-        await ctx.user_cache.refresh()
 
     @utils.command()
     async def leave(self, ctx: utils.Context, guild: Optional[discord.Guild]) -> None:
@@ -267,6 +267,81 @@ class Developer(utils.Cog):
 
         await ctx.send(f"```py\n{render}\n```")
 
+    @utils.command()
+    async def plans(self, ctx: utils.Context) -> None:
+        """Check whether the hot queries are able to use indexes.
+
+        Example:
+            **{p}plans**
+        """
+        results = await check_query_plans(ctx.bot.pool)
+        table = TabularData()
+        table.set_columns(["query", "sequential scans"])
+        table.add_rows([name, ", ".join(t) or "-"] for name, t in results.items())
+        await ctx.send(f"```py\n{table.render()}\n```")
+
+    @utils.group()
+    async def assets(self, ctx: utils.Context) -> None:
+        """Show how much memory the loaded image assets take.
+
+        The numbers are of this process only, every render worker
+        preloads its own copy of the assets on start.
+
+        Example:
+            **{p}assets**
+        """
+        usage = utils.assets.memory()
+        total = sum(usage.values())
+        table = TabularData()
+        table.set_columns(["asset", "KiB"])
+        table.add_rows([name, f"{size / 1024:.1f}"] for name, size in usage.items())
+        table.add_row(["total", f"{total / 1024:.1f}"])
+
+        workers = utils.renderer.stats["workers"]
+        await ctx.send(
+            f"Main process only, each of the {workers} render workers keeps its "
+            f"own copy, about {total * (workers + 1) / 1024:.1f} KiB in all."
+            f"\n```py\n{table.render()}\n```"
+        )
+
+    @assets.command(name="reload")
+    async def _assets_reload(self, ctx: utils.Context) -> None:
+        """Reload templates and fonts after they were changed on disk.
+
+        Example:
+            **{p}assets reload**
+        """
+        # workers keep their own copies. They go first, renders that are
+        # cached under the new asset version must come from the new files.
+        await utils.renderer.restart()
+        await asyncio.to_thread(utils.assets.reload)
+        await ctx.send("✅ Reloaded the image assets.")
+
+    @utils.command(name="renderstats")
+    async def _render_stats(self, ctx: utils.Context) -> None:
+        """Show the render queue depth, operation timings and cache usage.
+
+        Example:
+            **{p}renderstats**
+        """
+        stats = utils.renderer.stats
+        table = TabularData()
+        table.set_columns(["operation", "count", "avg wait", "avg render", "max"])
+        keys = ("avg_wait", "avg_render", "max_render")
+        table.add_rows(
+            [name, op["count"]] + [f"{op[k] * 1000:.0f}ms" for k in keys]
+            for name, op in stats["ops"].items()
+        )
+        await ctx.send(
+            f"Workers: {stats['workers']}, running: {stats['running']}, "
+            f"waiting: {stats['waiting']}, rejected: {stats['rejected']}"
+            f"\n```py\n{table.render()}\n```"
+        )
+        if cache := utils.renderer.cache:
+            await ctx.send(
+                "Cache: " + ", ".join(f"{k}: {v}" for k, v in cache.stats.items())
+            )
+
     @utils.group()
     async def git(self, ctx: utils.Context) -> None:
         """A set of git command-line features to work with."""
@@ -404,14 +479,17 @@ class Developer(utils.Cog):
     @idea.command()
     @commands.is_owner()
     async def pending(
-        self, ctx: utils.Context, limit: int = 10, approved: bool = False
+        self,
+        ctx: utils.Context,
+        limit: commands.Range[int, 1, 50] = 10,
+        approved: bool = False,
     ) -> None:
         """Check out all pending suggestions.
 
         Parameters
         ----------
         limit : int, optional
-            Limit for ideas to be shown, by default 10
+            Ideas to be shown per page, from 1 to 50, by default 10
         approved : bool, optional
             Whether to take only approved ideas, by default False
         """
@@ -419,13 +497,12 @@ class Developer(utils.Cog):
             "Currently, there are no suggestions waiting to be approved.",
             "There are no any approved ideas yet.",
         ]
-        query = (
-            f"SELECT id, content, author_id FROM ideas WHERE approved is {approved};"
-        )
-        if not (data := await ctx.bot.pool.fetch(query)):
+        source = IdeaPageSource(ctx, approved, per_page=limit)
+        await source.prepare()
+        if not source.count:
             return await ctx.send(answers[approved])
 
-        menu = utils.Paginate(source=IdeaPageSource(ctx, data))
+        menu = utils.Paginate(source=source)
         await menu.start(ctx)
 
     @idea.command()
@@ -1,16 +1,19 @@
-from discord.ext import menus
-
 from boribay.core import utils
 
 
-class IdeaPageSource(menus.ListPageSource):
+class IdeaPageSource(utils.KeysetPageSource):
     """IdeaPageSource, a special paginator created for the idea commands parent.
 
-    Takes the list of data, enumerates, then paginates through.
+    Fetches the suggestions page by page, enumerates, then paginates through.
     """
 
-    def __init__(self, ctx: utils.Context, data: list):
-        super().__init__(data, per_page=10)
+    def __init__(self, ctx: utils.Context, approved: bool, per_page: int = 10):
+        super().__init__(
+            ctx.bot.pool,
+            "SELECT id, content, author_id FROM ideas WHERE approved = $1",
+            approved,
+            per_page=per_page,
+        )
         self.ctx = ctx
 
     def _format_content(self, entry: str):
@@ -24,7 +27,7 @@ class IdeaPageSource(menus.ListPageSource):
                 f'{x["id"]}. {self._format_content(x)}' for x in entries
             )
         ).set_author(
-            name=f"Page {menu.current_page + 1} of {self.get_max_pages()} ({len(self.entries)} suggestions).",
+            name=f"Page {menu.current_page + 1} of {self.get_max_pages()} ({self.count} suggestions).",
             icon_url=self.ctx.author.avatar,
         )
 
@@ -93,3 +93,10 @@ class EmptyBrackets(CalcError):
 
     def __str__(self):
         return "Given expression has empty brackets."
+
+
+class RenderOverloaded(UserError):
+    """Raised when the image render queue is full."""
+
+    def __init__(self):
+        super().__init__("Too many images are being rendered now, try again later.")
@@ -0,0 +1,144 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from asyncpg.pool import Pool
+from sortedcontainers import SortedList
+
+__all__ = ("Leaderboard",)
+
+
+class Leaderboard:
+    """In-memory net worth ranking of the economics system.
+
+    Users are kept in a sorted list keyed on `(-net worth, user_id)`, so
+    both the top of the board and the rank of a user are answered in
+    logarithmic time instead of sorting the whole `users` table.
+
+    It is loaded once on startup and then kept up to date by balance
+    writes, either directly from `DatabaseManager` or through
+    `CacheListener` for writes made by other processes.
+    """
+
+    def __init__(self, db: Pool):
+        self.db = db
+        self._scores: Dict[int, int] = {}
+        self._ranking = SortedList()
+
+    def __await__(self):  # await Leaderboard(...
+        return self.refresh().__await__()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __repr__(self) -> str:
+        return f"<Leaderboard users={len(self)}>"
+
+    async def refresh(self) -> "Leaderboard":
+        """Fill the board up with every user from the database."""
+        records = await self.db.fetch(
+            "SELECT user_id, COALESCE(wallet, 0) + COALESCE(bank, 0) AS networth "
+            "FROM users"
+        )
+        self._scores = {r["user_id"]: r["networth"] for r in records}
+        self._ranking = SortedList((-v, k) for k, v in self._scores.items())
+        return self
+
+    def update(self, user_id: int, networth: int) -> None:
+        """Set the net worth of a user.
+
+        Parameters
+        ----------
+        user_id : int
+            The ID of the user.
+        networth : int
+            The wallet and bank sum of the user.
+        """
+        self.remove(user_id)
+        self._scores[user_id] = networth
+        self._ranking.add((-networth, user_id))
+
+    def remove(self, user_id: int) -> None:
+        """Drop a user from the board.
+
+        Parameters
+        ----------
+        user_id : int
+            The ID of the user.
+        """
+        if (old := self._scores.pop(user_id, None)) is not None:
+            self._ranking.remove((-old, user_id))
+
+    def upsert(self, record) -> None:
+        """Track a `users` row, e.g the one a write gave back.
+
+        Parameters
+        ----------
+        record : asyncpg.Record
+            A full row of the `users` table.
+        """
+        self.update(record["user_id"], (record["wallet"] or 0) + (record["bank"] or 0))
+
+    def apply(self, op: str, record: dict) -> None:
+        """Apply a change notified by `CacheListener`.
+
+        Parameters
+        ----------
+        op : str
+            The operation, one of `INSERT`, `UPDATE` or `DELETE`.
+        record : dict
+            The full changed row.
+        """
+        if op == "DELETE":
+            return self.remove(record["user_id"])
+
+        self.upsert(record)
+
+    def networth(self, user_id: int) -> Optional[int]:
+        """Get the net worth of a user, `None` if they are not registered."""
+        return self._scores.get(user_id)
+
+    def rank(self, user_id: int, *, within: Iterable[int] = None) -> Optional[int]:
+        """Get the 1-based rank of a user, users with equal net worth share it.
+
+        Parameters
+        ----------
+        user_id : int
+            The ID of the user.
+        within : Iterable[int], optional
+            Rank among these users only (e.g members of a guild),
+            this is linear in their count, by default None
+
+        Returns
+        -------
+        Optional[int]
+            The rank, `None` if the user is not on the board.
+        """
+        if (score := self._scores.get(user_id)) is None:
+            return None
+
+        if within is None:
+            return self._ranking.bisect_left((-score,)) + 1
+
+        return 1 + sum(1 for u in set(within) if self._scores.get(u, score) > score)
+
+    def top(self, limit: int, *, within: Iterable[int] = None) -> List[Tuple[int, int]]:
+        """Get the richest users.
+
+        Parameters
+        ----------
+        limit : int
+            How many users to get.
+        within : Iterable[int], optional
+            Take only these users into account (e.g members of a guild),
+            by default None
+
+        Returns
+        -------
+        List[Tuple[int, int]]
+            Pairs of user IDs and their net worth, the richest first.
+        """
+        if within is None:
+            return [(u, -s) for s, u in self._ranking.islice(0, limit)]
+
+        entries = ((-self._scores[u], u) for u in set(within) if u in self._scores)
+        return [(u, -s) for s, u in heapq.nsmallest(limit, entries)]
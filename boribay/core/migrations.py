@@ -0,0 +1,180 @@
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from asyncpg.pool import Pool
+
+__all__ = ("migrate", "check_query_plans", "HOT_QUERIES")
+
+logger = logging.getLogger("bot.migrations")
+
+MIGRATIONS_PATH = "./data/migrations"
+# Any constant works, it only has to be the same for every bot process.
+LOCK_ID = 0x626F7269
+
+HOT_QUERIES: Dict[str, Tuple[str, tuple]] = {
+    "user lookup": ("SELECT * FROM users WHERE user_id = $1", (0,)),
+    "guild lookup": ("SELECT * FROM guild_config WHERE guild_id = $1", (0,)),
+    "transfer lock": (
+        "SELECT user_id FROM users WHERE user_id = ANY($1::bigint[]) "
+        "ORDER BY user_id FOR UPDATE",
+        ([0, 1],),
+    ),
+    "leaderboard": (
+        "SELECT user_id FROM users ORDER BY wallet + bank DESC, user_id LIMIT 10",
+        (),
+    ),
+    "todo page": (
+        "SELECT id, content, jump_url FROM todos WHERE user_id = $1 "
+        "ORDER BY added_at, id LIMIT 10",
+        (0,),
+    ),
+    "pending ideas": (
+        "SELECT id, content, author_id FROM ideas WHERE approved = false "
+        "ORDER BY id LIMIT 10",
+        (),
+    ),
+}
+
+
+def discover(path: str = MIGRATIONS_PATH) -> List[Tuple[int, str, Path]]:
+    """Find migration files, named like `0001_initial.sql`.
+
+    Parameters
+    ----------
+    path : str, optional
+        The directory to look in, by default MIGRATIONS_PATH
+
+    Returns
+    -------
+    List[Tuple[int, str, Path]]
+        Versions, names and paths of the migrations, in order.
+
+    Raises
+    ------
+    RuntimeError
+        If two migrations share the same version.
+    """
+    found = {}
+
+    for file in Path(path).glob("*.sql"):
+        if not (match := re.fullmatch(r"(\d+)_(\w+)\.sql", file.name)):
+            continue
+
+        version = int(match.group(1))
+        if version in found:
+            raise RuntimeError(f"Migrations {found[version][2]} and {file} clash.")
+
+        found[version] = (version, match.group(2), file)
+
+    return [found[v] for v in sorted(found)]
+
+
+async def migrate(pool: Pool, path: str = MIGRATIONS_PATH) -> List[str]:
+    """Apply every migration that was not applied to the database yet.
+
+    Each migration runs in its own transaction together with its record
+    in `schema_migrations`. An advisory lock keeps several bot processes
+    from migrating at the same time.
+
+    Parameters
+    ----------
+    pool : Pool
+        The pool to get the connection from.
+    path : str, optional
+        The directory with the migration files, by default MIGRATIONS_PATH
+
+    Returns
+    -------
+    List[str]
+        Names of the migrations that were applied.
+    """
+    applied_now = []
+
+    async with pool.acquire() as conn:
+        await conn.execute("SELECT pg_advisory_lock($1)", LOCK_ID)
+
+        try:
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMP WITHOUT TIME ZONE
+                        DEFAULT (CURRENT_TIMESTAMP AT TIME ZONE 'UTC')
+                )
+                """
+            )
+            applied = {
+                r["version"]
+                for r in await conn.fetch("SELECT version FROM schema_migrations")
+            }
+
+            for version, name, file in discover(path):
+                if version in applied:
+                    continue
+
+                async with conn.transaction():
+                    await conn.execute(file.read_text())
+                    await conn.execute(
+                        "INSERT INTO schema_migrations(version, name) VALUES($1, $2)",
+                        version,
+                        name,
+                    )
+
+                logger.info(f"Applied migration {file.name}")
+                applied_now.append(file.name)
+
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", LOCK_ID)
+
+    return applied_now
+
+
+def _seq_scans(plan: dict) -> List[str]:
+    found = []
+
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan["Relation Name"])
+
+    for child in plan.get("Plans", ()):
+        found.extend(_seq_scans(child))
+
+    return found
+
+
+async def check_query_plans(pool: Pool) -> Dict[str, List[str]]:
+    """Check that the hot queries can be served by indexes.
+
+    Small tables are always scanned sequentially by the planner, so the
+    plans are made with `enable_seqscan` turned off: a sequential scan
+    that still shows up means there is no index the query could use.
+
+    Parameters
+    ----------
+    pool : Pool
+        The pool to get the connection from.
+
+    Returns
+    -------
+    Dict[str, List[str]]
+        Names of the hot queries and the tables each one scans sequentially,
+        an empty list means the query is fine.
+    """
+    results = {}
+
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute("SET LOCAL enable_seqscan = off")
+
+            for name, (query, args) in HOT_QUERIES.items():
+                plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *args)
+                results[name] = _seq_scans(json.loads(plan)[0]["Plan"])
+
+    for name, tables in results.items():
+        if tables:
+            logger.warning(f'Query "{name}" scans {", ".join(tables)} sequentially.')
+
+    return results
@@ -1,6 +1,9 @@
+from .assets import *
 from .checks import *
 from .commands import *
 from .context import *
 from .converters import *
+from .fetcher import *
 from .manipulation import *
 from .paginators import *
+from .render import *
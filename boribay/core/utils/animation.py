@@ -0,0 +1,164 @@
+import math
+from io import BytesIO
+from typing import BinaryIO, Callable, Iterator, Tuple
+
+from PIL import Image, ImageSequence
+
+from boribay.settings import GIF_MAX_FRAMES, GIF_MAX_PIXELS
+
+__all__ = ("GifWriter", "animate", "is_animated", "kept_frames")
+
+
+def is_animated(image: Image.Image) -> bool:
+    return getattr(image, "is_animated", False)
+
+
+def _blocks(data: bytes, offset: int) -> int:
+    # skip data sub-blocks, returning the offset after the terminator.
+    while data[offset]:
+        offset += data[offset] + 1
+    return offset + 1
+
+
+class GifWriter:
+    """Writes an animated GIF one frame at a time.
+
+    Pillow only writes animations from a complete list of frames, so every
+    frame is saved as a single-frame GIF whose global palette is moved into
+    a local one, and spliced into the output. Only one frame is ever kept.
+
+    Parameters
+    ----------
+    fp : BinaryIO
+        Where to write the GIF to.
+    size : Tuple[int, int]
+        The size of every frame.
+    """
+
+    def __init__(self, fp: BinaryIO, size: Tuple[int, int]) -> None:
+        self.fp = fp
+        self.size = size
+        self.frames = 0
+
+        w, h = size
+        fp.write(b"GIF89a" + w.to_bytes(2, "little") + h.to_bytes(2, "little"))
+        fp.write(b"\x00\x00\x00")  # no global palette, every frame has its own.
+        fp.write(b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")  # loop forever.
+
+    def write(self, frame: Image.Image, duration: int) -> None:
+        """Append a frame.
+
+        Parameters
+        ----------
+        frame : Image.Image
+            The frame, transparent pixels stay transparent.
+        duration : int
+            How long to show the frame for, in milliseconds.
+        """
+        frame = frame.convert("RGBA")
+        # median cut is slower by two orders of magnitude for little gain.
+        paletted = frame.convert("RGB").quantize(255, method=Image.FASTOCTREE)
+        transparent = frame.getchannel("A").point(lambda a: 255 if a < 128 else 0)
+        paletted.paste(255, mask=transparent)
+
+        buffer = BytesIO()
+        paletted.save(
+            buffer, "gif", duration=duration, disposal=2, transparency=255
+        )
+        data = buffer.getvalue()
+
+        flags = data[10]
+        table_end = 13 + (3 << ((flags & 7) + 1) if flags & 0x80 else 0)
+        table = data[13:table_end]
+
+        offset = table_end
+        while data[offset] == 0x21:  # extensions, only the control one is kept.
+            end = _blocks(data, offset + 2)
+            if data[offset + 1] == 0xF9:
+                self.fp.write(data[offset:end])
+            offset = end
+
+        # the image descriptor, now pointing to the local palette.
+        start, end = offset + 10, _blocks(data, offset + 11)
+        descriptor = bytearray(data[offset:start])
+        if table:
+            descriptor[9] |= 0x80 | (flags & 7)
+
+        self.fp.write(descriptor + table)
+        self.fp.write(data[start:end])
+        self.frames += 1
+
+    def close(self) -> None:
+        self.fp.write(b";")
+
+
+def _step(image: Image.Image) -> int:
+    w, h = image.size
+    count = image.n_frames
+    return max(
+        math.ceil(count / GIF_MAX_FRAMES),
+        math.ceil(count * w * h / GIF_MAX_PIXELS),
+    )
+
+
+def kept_frames(image: Image.Image) -> int:
+    """Get how many frames `frames` yields, reading the header only."""
+    if not is_animated(image):
+        return 1
+
+    return math.ceil(image.n_frames / _step(image))
+
+
+def frames(image: Image.Image) -> Iterator[Tuple[Image.Image, int]]:
+    """Decode the frames one by one, skipping some to stay within the caps.
+
+    The durations of skipped frames are added to the previous kept frame,
+    so the animation keeps its speed.
+
+    Yields
+    ------
+    Tuple[Image.Image, int]
+        An RGBA frame and how long it should be shown for, in milliseconds.
+    """
+    step = _step(image)
+    kept, duration = None, 0
+    for i, frame in enumerate(ImageSequence.Iterator(image)):
+        if i % step == 0:
+            if kept is not None:
+                yield kept, duration
+
+            kept, duration = frame.convert("RGBA"), 0
+
+        duration += frame.info.get("duration", 100)
+
+    yield kept, duration
+
+
+def animate(image: Image.Image, func: Callable[..., Image.Image], *args) -> BytesIO:
+    """Apply a filter to every frame of an animated image.
+
+    Parameters
+    ----------
+    image : Image.Image
+        The animated image.
+    func : Callable[..., Image.Image]
+        The filter, it gets a frame and `args`.
+
+    Returns
+    -------
+    BytesIO
+        The animated GIF.
+    """
+    buffer = BytesIO()
+    writer = None
+
+    for frame, duration in frames(image):
+        result = func(frame, *args)
+        if writer is None:
+            writer = GifWriter(buffer, result.size)
+
+        writer.write(result, duration)
+
+    writer.close()
+    buffer.seek(0)
+    return buffer
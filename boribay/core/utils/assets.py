@@ -0,0 +1,154 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageFont
+
+__all__ = ("AssetRegistry", "assets", "FONT_PATH", "IMAGE_PATH")
+
+FONT_PATH = "./data/fonts"
+IMAGE_PATH = "./data/layouts"
+
+
+class AssetRegistry:
+    """Templates and fonts used by `Manip`, decoded once and then reused.
+
+    Every render gets its own copy of a template, so it can be drawn on
+    freely, while fonts are shared since they are never modified.
+
+    Call `reload` after files under `data/` have changed, which also
+    changes `version`.
+    """
+
+    def __init__(self, image_path: str = IMAGE_PATH, font_path: str = FONT_PATH):
+        self.image_path = image_path
+        self.font_path = font_path
+
+        self._images: Dict[str, Image.Image] = {}
+        self._fonts: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<AssetRegistry images={len(self._images)} fonts={len(self._fonts)}>"
+
+    def _load_image(self, name: str) -> Image.Image:
+        with self._lock:
+            if name not in self._images:
+                image = Image.open(f"{self.image_path}/{name}")
+                image.load()
+                self._images[name] = image
+
+            return self._images[name]
+
+    def image(self, name: str) -> Image.Image:
+        """Get a fresh copy of a Pillow template.
+
+        Parameters
+        ----------
+        name : str
+            The path of the template relative to `data/layouts`, e.g `wanted.png`
+
+        Returns
+        -------
+        Image.Image
+            A copy that is safe to draw on.
+        """
+        return self._load_image(name).copy()
+
+    def size(self, name: str) -> Tuple[int, int]:
+        """Get the size of a Pillow template without copying it."""
+        return self._load_image(name).size
+
+    def font(self, name: str, size: int) -> ImageFont.FreeTypeFont:
+        """Get a parsed font, shared between renders.
+
+        Parameters
+        ----------
+        name : str
+            The font file name under `data/fonts`, e.g `arial_bold.ttf`
+        size : int
+            The font size.
+
+        Returns
+        -------
+        ImageFont.FreeTypeFont
+            The font, do not modify it.
+        """
+        with self._lock:
+            if (name, size) not in self._fonts:
+                self._fonts[name, size] = ImageFont.truetype(
+                    f"{self.font_path}/{name}", size
+                )
+
+            return self._fonts[name, size]
+
+    def _fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        for root in (self.image_path, self.font_path):
+            for path in sorted(Path(root).rglob("*")):
+                if path.is_file():
+                    stat = path.stat()
+                    digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}|".encode())
+
+        return digest.hexdigest()[:16]
+
+    @property
+    def version(self) -> str:
+        """Identifies the files under `data/` as of the last (re)load.
+
+        Renders made from other files must not be reused, so it is part of
+        the render cache keys.
+        """
+        if self._version is None:
+            self._version = self._fingerprint()
+
+        return self._version
+
+    def preload(self) -> None:
+        """Decode every Pillow template up front, e.g on startup."""
+        self._version = self._fingerprint()
+        for path in Path(self.image_path).rglob("*"):
+            if path.is_file():
+                self._load_image(path.relative_to(self.image_path).as_posix())
+
+    def reload(self) -> None:
+        """Forget everything and decode again what was in use."""
+        with self._lock:
+            images, fonts = list(self._images), list(self._fonts)
+            self._images.clear()
+            self._fonts.clear()
+            self._version = self._fingerprint()
+
+        for name in images:
+            self._load_image(name)
+
+        for name, size in fonts:
+            self.font(name, size)
+
+    def memory(self) -> Dict[str, int]:
+        """Estimate how many bytes each loaded asset takes.
+
+        Returns
+        -------
+        Dict[str, int]
+            Asset names and their decoded size in bytes.
+        """
+        with self._lock:
+            usage = {
+                name: image.width * image.height * len(image.getbands())
+                for name, image in self._images.items()
+            }
+            usage.update(
+                {
+                    f"{name} ({size}px)": os.path.getsize(f"{self.font_path}/{name}")
+                    for name, size in self._fonts
+                }
+            )
+
+        return usage
+
+
+assets = AssetRegistry()
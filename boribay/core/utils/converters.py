@@ -1,12 +1,25 @@
+import asyncio
 import re
 from contextlib import suppress
 from copy import copy
 from enum import Enum
+from io import BytesIO
 from typing import List, Union
 
+import aiohttp
 import discord
 from discord.ext import commands
-from PIL import ImageColor
+from PIL import Image, ImageColor, UnidentifiedImageError
+
+from boribay.settings import (
+    IMAGE_DOWNLOAD_TIMEOUT,
+    IMAGE_MAX_BYTES,
+    IMAGE_MAX_FRAMES,
+    IMAGE_MAX_PIXELS,
+    IMAGE_MAX_SIDE,
+)
+
+from .animation import animate, is_animated
 
 __all__ = (
     "AuthorCheckConverter",
@@ -38,6 +51,113 @@ async def emoji_to_url(char, *, session):
     return char
 
 
+# The signatures of the formats we accept, checked on the first chunk.
+MAGIC_BYTES = (b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF87a", b"GIF89a")
+
+
+def is_image(head: bytes) -> bool:
+    return head.startswith(MAGIC_BYTES) or (
+        head[:4] == b"RIFF" and head[8:12] == b"WEBP"
+    )
+
+
+async def download(session: aiohttp.ClientSession, url: str) -> bytes:
+    """Download an image, giving up as soon as it does not look like one.
+
+    The body is streamed and the download stops at `IMAGE_MAX_BYTES`.
+
+    Args:
+        session (aiohttp.ClientSession): The session to download with.
+        url (str): The URL of the image.
+
+    Raises:
+        commands.BadArgument: The URL does not point to an acceptable image.
+
+    Returns:
+        bytes: The downloaded image.
+    """
+    timeout = aiohttp.ClientTimeout(total=IMAGE_DOWNLOAD_TIMEOUT)
+    try:
+        async with session.get(url, timeout=timeout) as r:
+            if r.status != 200:
+                raise commands.BadArgument(f"Could not download the image ({r.status})")
+
+            # a missing Content-Type reads as octet-stream, the magic bytes decide.
+            if r.content_type != "application/octet-stream" and not (
+                r.content_type.startswith("image/")
+            ):
+                raise commands.BadArgument("The given URL does not lead to an image.")
+
+            if (r.content_length or 0) > IMAGE_MAX_BYTES:
+                raise commands.BadArgument("The given image is too large.")
+
+            data, checked = bytearray(), False
+            async for chunk in r.content.iter_chunked(64 * 1024):
+                data += chunk
+                if len(data) > IMAGE_MAX_BYTES:
+                    raise commands.BadArgument("The given image is too large.")
+
+                if not checked and len(data) >= 12:
+                    checked = True
+                    if not is_image(data):
+                        raise commands.BadArgument("The given file is not an image.")
+
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        raise commands.BadArgument("Could not download the image.")
+
+    if not is_image(data):
+        raise commands.BadArgument("The given file is not a supported image.")
+
+    return bytes(data)
+
+
+def _shrink(frame: Image.Image) -> Image.Image:
+    frame.thumbnail((IMAGE_MAX_SIDE, IMAGE_MAX_SIDE))
+    return frame
+
+
+def fit_image(data: bytes) -> bytes:
+    """Check an image against the pixel and frame budgets and downscale it if needed.
+
+    Only the header is read before the checks, so a decompression bomb never
+    gets decoded. Run it in a thread, the render pool and its cache are
+    kept for the renders.
+
+    Args:
+        data (bytes): The downloaded image.
+
+    Raises:
+        commands.BadArgument: The image is over the budget or can not be read.
+
+    Returns:
+        bytes: The same image, or a PNG (a GIF if animated) no larger
+            than `IMAGE_MAX_SIDE`.
+    """
+    try:
+        with Image.open(BytesIO(data)) as im:
+            w, h = im.size
+            if w * h > IMAGE_MAX_PIXELS:
+                raise commands.BadArgument(f"The given image is too large ({w}x{h}).")
+
+            if getattr(im, "n_frames", 1) > IMAGE_MAX_FRAMES:
+                raise commands.BadArgument("The given image has too many frames.")
+
+            if max(w, h) <= IMAGE_MAX_SIDE:
+                return data
+
+            if is_animated(im):
+                return animate(im, _shrink).getvalue()
+
+            im.thumbnail((IMAGE_MAX_SIDE, IMAGE_MAX_SIDE))
+            buffer = BytesIO()
+            im.save(buffer, "png")
+
+    except (UnidentifiedImageError, Image.DecompressionBombError):
+        raise commands.BadArgument("The given file is not a supported image.")
+
+    return buffer.getvalue()
+
+
 class Regex(Enum):
     """Enumeration of regexes to help us with converting."""
 
@@ -140,8 +260,33 @@ class ImageConverter(commands.Converter):
     This class inherits from `commands.Converter`.
     """
 
+    @staticmethod
+    async def read_url(ctx, url: str) -> bytes:
+        """Safely download an image from a user-supplied URL.
+
+        Parameters
+        ----------
+        ctx
+            The context instance.
+        url : str
+            The URL of the image.
+
+        Returns
+        -------
+        bytes
+            The image, downscaled if it was too large.
+        """
+        data = await download(ctx.bot.session, url)
+        return await asyncio.to_thread(fit_image, data)
+
     async def convert(
-        self, ctx, argument: Union[discord.Emoji, str], *, return_url: bool = False
+        self,
+        ctx,
+        argument: Union[discord.Emoji, str],
+        *,
+        size: int = 512,
+        animated: bool = False,
+        return_url: bool = False,
     ) -> Union[bytes, str]:
         """The function that does the actual thing we are expecting from this class.
 
@@ -151,6 +296,10 @@ class ImageConverter(commands.Converter):
             The context instance.
         argument : Union[discord.Emoji, str]
             The argument to convert into an image.
+        size : int, optional
+            The avatar size to request from the CDN, by default 512
+        animated : bool, optional
+            Whether to keep animated avatars animated, by default False
         return_url : bool, optional
             Whether to return URL for the image, by default False
 
@@ -163,10 +312,13 @@ class ImageConverter(commands.Converter):
         try:
             mc = commands.MemberConverter()
             member = await mc.convert(ctx, argument)
-            avatar = member.avatar.replace(static_format="png", format="png", size=512)
             if return_url:
-                return str(avatar)
-            return await avatar.read()
+                return str(
+                    ctx.bot.fetcher.resolve(member.display_avatar, size, animated)
+                )
+            return await ctx.bot.fetcher.fetch(
+                member.display_avatar, size=size, animated=animated
+            )
 
         except (TypeError, commands.MemberNotFound):
             try:
@@ -176,16 +328,12 @@ class ImageConverter(commands.Converter):
                 if re.match(Regex.URL, url):
                     if return_url:
                         return url
-                    r = await cs.get(url)
-                    image = await r.read()
-                    return image
+                    return await self.read_url(ctx, url)
 
                 if re.match(Regex.URL, argument):
                     if return_url:
                         return argument
-                    r = await cs.get(argument)
-                    image = await r.read()
-                    return image
+                    return await self.read_url(ctx, argument)
 
                 elif re.match(Regex.EMOJI, argument):
                     ec = commands.PartialEmojiConverter()
@@ -0,0 +1,57 @@
+from io import BytesIO
+
+from PIL import Image
+
+from boribay.settings import IMAGE_ENCODING
+
+__all__ = ("ENCODERS", "check_encoding", "encode", "extension")
+
+# name: (Pillow format, file extension, save options)
+ENCODERS = {
+    "png": ("png", "png", {"compress_level": 1}),
+    "webp": ("webp", "webp", {"lossless": True, "quality": 0, "method": 0}),
+    "jpeg": ("jpeg", "jpg", {"quality": 85}),
+}
+
+
+def check_encoding() -> None:
+    """Make sure `IMAGE_ENCODING` names an encoder, before any render needs it.
+
+    Raises:
+        ValueError: `IMAGE_ENCODING` is set to an unknown encoder.
+    """
+    if IMAGE_ENCODING and IMAGE_ENCODING not in ENCODERS:
+        raise ValueError(
+            f"Unknown IMAGE_ENCODING: {IMAGE_ENCODING!r}, "
+            f"expected one of {', '.join(ENCODERS)}"
+        )
+
+
+def resolve(policy: str) -> str:
+    """Get the encoder to use, `IMAGE_ENCODING` overrides every policy."""
+    return IMAGE_ENCODING or policy
+
+
+def extension(policy: str) -> str:
+    """Get the file extension of what the policy encodes to."""
+    return ENCODERS[resolve(policy)][1]
+
+
+def encode(image: Image.Image, policy: str) -> BytesIO:
+    """Encode a rendered image.
+
+    Args:
+        image (Image.Image): The image to encode.
+        policy (str): The name of an encoder from `ENCODERS`
+
+    Returns:
+        BytesIO: The encoded image, ready to be sent.
+    """
+    fmt, _, options = ENCODERS[resolve(policy)]
+    if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    buffer = BytesIO()
+    image.save(buffer, fmt, **options)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+import discord
+
+__all__ = ("AssetFetcher",)
+
+Key = Tuple[str, int, bool]
+
+
+class AssetFetcher:
+    """Downloads Discord assets, avatars mostly, and keeps the bytes around.
+
+    Assets are keyed by their hash, the requested size and whether the
+    animated version was asked for, so a changed avatar is a different
+    entry. Concurrent fetches of the same asset share one download.
+
+    Parameters
+    ----------
+    max_bytes : int
+        How many bytes of assets to keep, least recently used ones go first.
+    ttl : float
+        How many seconds an asset is kept for.
+    """
+
+    def __init__(self, *, max_bytes: int, ttl: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[Key, Tuple[float, bytes]]" = OrderedDict()
+        self._pending: Dict[Key, asyncio.Future] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"<AssetFetcher entries={len(self._cache)} size={self.size} "
+            f"hits={self.hits} misses={self.misses}>"
+        )
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._cache),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    @staticmethod
+    def resolve(
+        asset: discord.Asset, size: int = 512, animated: bool = False
+    ) -> discord.Asset:
+        """Get the static PNG version of an asset at the given size.
+
+        Animated assets are resolved to a GIF instead if `animated` is set.
+        """
+        if animated and asset.is_animated():
+            return asset.replace(format="gif", size=size)
+
+        return asset.replace(static_format="png", format="png", size=size)
+
+    def _drop(self, key: Key) -> None:
+        _, data = self._cache.pop(key)
+        self.size -= len(data)
+
+    async def _download(self, key: Key, asset: discord.Asset) -> bytes:
+        data = await self.resolve(asset, key[1], key[2]).read()
+
+        if key in self._cache:
+            self._drop(key)
+
+        self._cache[key] = (time.monotonic() + self.ttl, data)
+        self.size += len(data)
+        while self.size > self.max_bytes and self._cache:
+            self._drop(next(iter(self._cache)))
+
+        return data
+
+    async def fetch(
+        self, asset: discord.Asset, *, size: int = 512, animated: bool = False
+    ) -> bytes:
+        """Get the bytes of an asset, downloading it only on a cache miss.
+
+        Parameters
+        ----------
+        asset : discord.Asset
+            The asset to fetch, e.g `member.display_avatar`
+        size : int, optional
+            The size to request from the CDN, by default 512
+        animated : bool, optional
+            Whether to fetch animated assets as GIFs, by default False
+
+        Returns
+        -------
+        bytes
+            The PNG bytes of the asset, or the GIF ones if it was animated.
+        """
+        key = (asset.key, size, animated and asset.is_animated())
+
+        if (entry := self._cache.get(key)) is not None:
+            expires, data = entry
+            if expires > time.monotonic():
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return data
+
+            self._drop(key)
+
+        if (future := self._pending.get(key)) is None:
+            self.misses += 1
+            future = self._pending[key] = asyncio.ensure_future(
+                self._download(key, asset)
+            )
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+
+        return await asyncio.shield(future)
@@ -0,0 +1,238 @@
+import math
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from boribay.settings import ASCII_MAX_PIXELS, OVERLAY_CACHE_SIZE
+
+from .assets import assets
+
+
+def to_array(image: Image.Image) -> np.ndarray:
+    """Convert an image to a float32 RGBA array in the 0..1 range."""
+    return np.asarray(image.convert("RGBA"), dtype=np.float32) / 255
+
+
+def from_array(array: np.ndarray) -> Image.Image:
+    """Convert a 0..1 RGBA array back to an image."""
+    return Image.fromarray(np.rint(array * 255).astype(np.uint8), "RGBA")
+
+
+def fade(layer: np.ndarray, transparency: float) -> np.ndarray:
+    """Lower the alpha of a layer the way ImageMagick's `transparentize` does.
+
+    Args:
+        layer (np.ndarray): An RGBA array.
+        transparency (float): How much to subtract from the alpha, 0..1
+
+    Returns:
+        np.ndarray: A new array with ``alpha = max(alpha - transparency, 0)``
+    """
+    faded = layer.copy()
+    faded[..., 3] = np.maximum(faded[..., 3] - transparency, 0)
+    return faded
+
+
+def over(base: np.ndarray, top: np.ndarray) -> np.ndarray:
+    """Composite `top` over `base`, both being RGBA arrays of the same shape."""
+    top_alpha, base_alpha = top[..., 3:], base[..., 3:]
+    alpha = top_alpha + base_alpha * (1 - top_alpha)
+    color = top[..., :3] * top_alpha + base[..., :3] * base_alpha * (1 - top_alpha)
+    np.divide(color, alpha, out=color, where=alpha > 0)
+    return np.concatenate((color, alpha), axis=-1)
+
+
+def bucket(size: Tuple[int, int]) -> Tuple[int, int]:
+    """Round a size up to a multiple of 8, so near sizes share an overlay."""
+    return tuple(-(-side // 8) * 8 for side in size)
+
+
+@lru_cache(maxsize=OVERLAY_CACHE_SIZE)
+def _layer(layout: str, size: Tuple[int, int], transparency: float) -> np.ndarray:
+    image = assets.image(layout).convert("RGBA").resize(size, Image.LANCZOS)
+    # kept as uint8, which makes the cache four times smaller than float32.
+    layer = np.rint(fade(to_array(image), transparency) * 255).astype(np.uint8)
+    layer.flags.writeable = False
+    return layer
+
+
+def overlay(image: Image.Image, layout: str, transparency: float) -> Image.Image:
+    """Stretch a layout over an image, the replacement of Wand's `watermark`.
+
+    Layouts already resized to the bucket of the image size are reused,
+    only cropped to the exact size.
+
+    Args:
+        image (Image.Image): The image to put the layout on.
+        layout (str): The layout name in the asset registry, e.g `jailbars.png`
+        transparency (float): How transparent the layout gets, 0..1
+
+    Returns:
+        Image.Image: The blended RGBA image.
+    """
+    w, h = image.size
+    top = _layer(layout, bucket(image.size), transparency)[:h, :w]
+    return from_array(over(to_array(image), top.astype(np.float32) / 255))
+
+
+def pixelate(image: Image.Image, blocks: int = 32) -> Image.Image:
+    """Replace every block of pixels with its average color.
+
+    A box downscale averages exactly the pixels each block covers, which
+    is what NumPy would do here, only without the temporary arrays.
+
+    Args:
+        image (Image.Image): The image to pixelate.
+        blocks (int, optional): How many blocks to fit along each side.
+
+    Returns:
+        Image.Image: The pixelated RGBA image, the same size as the input.
+    """
+    image = image.convert("RGBA")
+    small = image.resize((blocks, blocks), Image.BOX)
+    return small.resize(image.size, Image.NEAREST)
+
+
+def _sample(array: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # Bilinear interpolation, coordinates past the edges take the edge pixels.
+    h, w, channels = array.shape
+    flat = array.reshape(-1, channels)
+    x, y = np.clip(x, 0, w - 1), np.clip(y, 0, h - 1)
+    x0, y0 = x.astype(np.intp), y.astype(np.intp)
+    fx, fy = (x - np.floor(x))[:, None], (y - np.floor(y))[:, None]
+
+    top_left = y0 * w + x0
+    top_right = top_left + (x0 < w - 1)
+    down = (y0 < h - 1) * w
+
+    top = flat.take(top_left, 0)
+    top += (flat.take(top_right, 0) - top) * fx
+    bottom = flat.take(top_left + down, 0)
+    bottom += (flat.take(top_right + down, 0) - bottom) * fx
+    top += (bottom - top) * fy
+    return top
+
+
+def swirl(image: Image.Image, degrees: float) -> Image.Image:
+    """Swirl the pixels around the center, as ImageMagick's `-swirl` does.
+
+    Args:
+        image (Image.Image): The image to swirl.
+        degrees (float): The angle at the center, fading out towards the edge.
+
+    Returns:
+        Image.Image: The swirled RGBA image.
+    """
+    array = np.asarray(image.convert("RGBA"), dtype=np.float32)
+    h, w = array.shape[:2]
+    cx, cy = w / 2, h / 2
+    radius = max(cx, cy)
+    sx, sy = max(h / w, 1), max(w / h, 1)  # swirl elliptic images as a circle.
+
+    dy, dx = np.mgrid[0:h, 0:w].astype(np.float32)
+    dx, dy = sx * (dx - cx), sy * (dy - cy)
+    distance = np.sqrt(dx * dx + dy * dy)
+
+    # pixels outside of the circle stay where they are.
+    inside = distance < radius
+    dx, dy = dx[inside], dy[inside]
+    factor = 1 - distance[inside] / radius
+    angle = np.float32(np.radians(degrees)) * factor * factor
+    sine, cosine = np.sin(angle), np.cos(angle)
+    x = (cosine * dx - sine * dy) / sx + cx
+    y = (sine * dx + cosine * dy) / sy + cy
+
+    result = array.copy()
+    result[inside] = _sample(array, x, y)
+    return Image.fromarray(np.rint(result).astype(np.uint8), "RGBA")
+
+
+# From the sparsest glyph to the densest one.
+ASCII_RAMP = " .:-=+*#%@"
+
+
+@lru_cache(maxsize=None)
+def _glyphs(font: str, size: int) -> np.ndarray:
+    font = assets.font(font, size)
+    width = font.getsize("@")[0]
+    height = sum(font.getmetrics())
+
+    glyphs = np.zeros((len(ASCII_RAMP), height, width), dtype=np.uint8)
+    for i, char in enumerate(ASCII_RAMP):
+        cell = Image.new("L", (width, height))
+        ImageDraw.Draw(cell).text((0, 0), char, 255, font=font)
+        glyphs[i] = np.asarray(cell)
+
+    glyphs.flags.writeable = False
+    return glyphs
+
+
+def ascii_layout(
+    image_size: Tuple[int, int],
+    columns: int = 80,
+    font: str = "monoid.ttf",
+    size: int = 12,
+) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Get how many glyphs `ascii_art` draws and how large its output is.
+
+    The rows are capped at twice the columns, so very tall images get
+    squashed, and the whole grid is scaled down to stay within
+    `ASCII_MAX_PIXELS`.
+
+    Args:
+        image_size (Tuple[int, int]): The size of the image to draw.
+        columns (int): How many glyphs wide the output should be.
+        font (str): A monospace font from `data/fonts`.
+        size (int): The font size.
+
+    Returns:
+        Tuple[Tuple[int, int], Tuple[int, int]]: The columns and rows of
+            glyphs, and the width and height of the output.
+    """
+    _, height, width = _glyphs(font, size).shape
+
+    w, h = image_size
+    rows = min(max(1, round(columns * h / w * width / height)), columns * 2)
+
+    scale = math.sqrt(ASCII_MAX_PIXELS / (columns * width * rows * height))
+    if scale < 1:
+        columns, rows = max(1, int(columns * scale)), max(1, int(rows * scale))
+
+    return (columns, rows), (columns * width, rows * height)
+
+
+def ascii_art(
+    image: Image.Image, columns: int = 80, font: str = "monoid.ttf", size: int = 12
+) -> Image.Image:
+    """Draw an image with colored glyphs, denser ones for brighter cells.
+
+    Every glyph is rendered once into a cached atlas, the picture is then
+    put together by indexing the atlas with the luminance of the cells,
+    without drawing any text per render.
+
+    Args:
+        image (Image.Image): The image to draw.
+        columns (int): How many glyphs wide the output is, see `ascii_layout`
+        font (str): A monospace font from `data/fonts`.
+        size (int): The font size.
+
+    Returns:
+        Image.Image: An RGB image of the size `ascii_layout` gives.
+    """
+    glyphs = _glyphs(font, size)
+    _, height, width = glyphs.shape
+
+    (columns, rows), _ = ascii_layout(image.size, columns, font, size)
+    cells = to_array(image.convert("RGBA").resize((columns, rows), Image.BOX))
+    color = cells[..., :3] * cells[..., 3:]  # transparent cells turn black.
+
+    luminance = color @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    index = np.minimum(luminance * len(ASCII_RAMP), len(ASCII_RAMP) - 1).astype(int)
+
+    # (rows, columns, height, width) masks, tinted and laid out row by row.
+    masks = glyphs[index].astype(np.float32) / 255
+    art = masks[..., None] * color[:, :, None, None, :]
+    art = art.transpose(0, 2, 1, 3, 4).reshape(rows * height, columns * width, 3)
+    return Image.fromarray(np.rint(art * 255).astype(np.uint8), "RGB")
@@ -1,32 +1,104 @@
-import asyncio
 import functools
+import inspect
 import textwrap
+import time
 from io import BytesIO
-from typing import Union
+from typing import Callable, Dict, List, Tuple, Union
 
-from PIL import Image, ImageColor, ImageDraw, ImageFont
-from wand.image import Image as WI
+from discord.ext import commands
+from PIL import Image, ImageColor, ImageDraw
 
+from boribay.settings import (
+    PIPELINE_MAX_PIXELS,
+    PIPELINE_MAX_SECONDS,
+    PIPELINE_MAX_STAGES,
+)
+
+from . import filters
+from .animation import GifWriter, animate, is_animated
+from .assets import assets
 from .converters import ImageConverter
+from .encoding import encode, extension
+from .render import executor, renderer
+
+Chain = List[Tuple[str, Tuple[int, ...]]]
+
+WELCOME_SLOTS = 8  # avatars that fit on a batched welcome card.
+
+# Where the image is moved to in every frame of `Manip.triggered`, fixed so
+# that the same input always renders the same GIF.
+TRIGGERED_SHAKE = (
+    (-8, 6), (7, -7), (-5, -8), (8, 5), (-7, -4), (4, 8), (-6, 7), (6, -5)
+)
+
+
+def input_size(size: int):
+    """Declare the largest side an operation needs its input images at.
+
+    Avatars for the operation then get requested from the CDN at the
+    nearest size instead of the default one, see `cdn_size`.
+
+    Args:
+        size (int): The largest side of the input after the operation resized it.
+    """
+
+    def decorator(func):
+        func.input_size = size
+        return func
 
-FONT_PATH = "./data/fonts"
-IMAGE_PATH = "./data/layouts"
+    return decorator
 
 
-def executor(func):
-    """Wraps a sync function into an async function.
+def encoded(policy: str = "png"):
+    """Encode the image an operation returns with the given policy.
 
-    This provides us non-blocking wrapped functions.
+    The unencoded operation stays available as `render`, and the policy
+    as `encoding`, see `filename`. Animated outputs come encoded already.
+
+    Args:
+        policy (str): The name of an encoder from `encoding.ENCODERS`
     """
 
-    @functools.wraps(func)
-    async def wrapper(*args, **kwargs):
-        """Sync function wrapper."""
-        loop = asyncio.get_event_loop()
-        partial_function = functools.partial(func, *args, **kwargs)
-        return await loop.run_in_executor(None, partial_function)
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if isinstance(result, BytesIO):
+                return result
+
+            return encode(result, policy)
+
+        wrapper.encoding = policy
+        wrapper.render = func
+        return wrapper
+
+    return decorator
+
+
+def filename(name: str, operation, output: BytesIO = None) -> str:
+    """Get the file name for an output of the operation, e.g `wanted.jpg`
+
+    Pass the output of operations that take animated images,
+    they return GIFs for those.
+    """
+    if output is not None and output.getvalue()[:3] == b"GIF":
+        return f"{name}.gif"
+
+    return f"{name}.{extension(operation.encoding)}"
+
 
-    return wrapper
+def cdn_size(size: int) -> int:
+    """Get the smallest size Discord's CDN serves that is at least `size`.
+
+    The CDN serves powers of two from 16 to 4096.
+
+    Args:
+        size (int): The wanted size.
+
+    Returns:
+        int: The size to request.
+    """
+    return min(max(16, 1 << (size - 1).bit_length()), 4096)
 
 
 def color_exists(color: str) -> bool:
@@ -48,274 +120,486 @@ def color_exists(color: str) -> bool:
 
 
 async def make_image(
-    ctx, argument: str, *, return_url: bool = False
+    ctx,
+    argument: str,
+    *,
+    size: int = 512,
+    animated: bool = False,
+    return_url: bool = False,
 ) -> Union[bytes, str]:
+    size = cdn_size(size)
     converter = ImageConverter()
-    image = await converter.convert(ctx, argument, return_url=return_url)
+    image = await converter.convert(
+        ctx, argument, size=size, animated=animated, return_url=return_url
+    )
 
     if not image:
         if ctx.message.attachments:
             attachment = ctx.message.attachments[0]
-            image = attachment.url if return_url else await attachment.read()
+            if return_url:
+                image = attachment.url
+            else:
+                image = await converter.read_url(ctx, attachment.url)
+        elif return_url:
+            image = str(
+                ctx.bot.fetcher.resolve(ctx.author.display_avatar, size, animated)
+            )
         else:
-            avatar = ctx.author.avatar.replace(
-                static_format="png", format="png", size=512
+            image = await ctx.bot.fetcher.fetch(
+                ctx.author.display_avatar, size=size, animated=animated
+            )
+
+    return image
+
+
+def _slots(count: int) -> List[Tuple[int, int]]:
+    # centered rows of four 128x128 avatars, above the bottom text.
+    rows = [min(4, count - i) for i in range(0, count, 4)]
+    top = 32 + (268 - len(rows) * 144 + 16) // 2
+    return [
+        ((600 - columns * 144 + 16) // 2 + column * 144, top + row * 144)
+        for row, columns in enumerate(rows)
+        for column in range(columns)
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _welcome_base(count: int) -> Image.Image:
+    card = Image.new("RGB", (600, 400))
+    draw = ImageDraw.Draw(card)
+    for x, y in _slots(count):
+        draw.rounded_rectangle((x - 4, y - 4, x + 131, y + 131), 8, (47, 49, 54))
+
+    return card
+
+
+# Single-image operations that can be chained, see `Manip.pipeline`
+STAGES: Dict[str, Callable[..., Image.Image]] = {}
+
+
+def stage(name: str, *, template: str = None, output: Callable = None):
+    """Register a function as a pipeline stage.
+
+    Stages with neither a template nor `output` keep the input size.
+
+    Args:
+        name (str): The name of the stage, the same as of its Manip method.
+        template (str, optional): The template the output is as big as, if any.
+        output (Callable, optional): Gets the input size and the stage
+            arguments, and returns the output size, for other sizes.
+    """
+
+    def decorator(func):
+        func.template = template
+        func.output = output
+        # everything after the image is an optional number.
+        func.max_args = len(inspect.signature(func).parameters) - 1
+        STAGES[name] = func
+        return func
+
+    return decorator
+
+
+@stage("pixelate")
+def _pixelate(image: Image.Image) -> Image.Image:
+    return filters.pixelate(image)
+
+
+@stage("wanted", template="wanted.png")
+def _wanted(image: Image.Image) -> Image.Image:
+    img = assets.image("wanted.png")
+    img.paste(image.resize((189, 205)), (73, 185))
+    return img
+
+
+@stage("jail")
+def _jail(image: Image.Image) -> Image.Image:
+    return filters.overlay(image, "jailbars.png", 0.3)
+
+
+@stage("press_f", template="f.png")
+def _press_f(image: Image.Image) -> Image.Image:
+    layout = assets.image("f.png")
+    # Pillow rotates counter-clockwise, this tilts the face to the left.
+    face = image.convert("RGBA").resize((52, 87)).rotate(5, expand=True)
+    layout.alpha_composite(face, (310, 71))
+    return layout
+
+
+@stage("rainbow")
+def _rainbow(image: Image.Image) -> Image.Image:
+    return filters.overlay(image, "rainbow.png", 0.5)
+
+
+@stage("communist")
+def _communist(image: Image.Image) -> Image.Image:
+    return filters.overlay(image, "communist-flag.jpg", 0.7)
+
+
+@stage("swirl")
+def _swirl(image: Image.Image, degree: int = 180) -> Image.Image:
+    return filters.swirl(image, max(-360, min(degree, 360)))
+
+
+def _ascii_columns(columns: int) -> int:
+    return max(16, min(columns, 160))
+
+
+def _ascii_size(size: Tuple[int, int], columns: int = 80) -> Tuple[int, int]:
+    return filters.ascii_layout(size, _ascii_columns(columns))[1]
+
+
+@stage("ascii", output=_ascii_size)
+def _ascii(image: Image.Image, columns: int = 80) -> Image.Image:
+    return filters.ascii_art(image, _ascii_columns(columns))
+
+
+@functools.lru_cache(maxsize=None)
+def _triggered_banner(width: int) -> Image.Image:
+    banner = Image.new("RGB", (width, width // 5), (255, 0, 0))
+    font = assets.font("arial_bold.ttf", width // 7)
+    draw = ImageDraw.Draw(banner)
+    text_w, text_h = draw.textsize("TRIGGERED", font=font)
+    draw.text(
+        ((width - text_w) / 2, (width // 5 - text_h) / 2),
+        "TRIGGERED",
+        (255, 255, 255),
+        font=font,
+        stroke_width=2,
+        stroke_fill=(0, 0, 0),
+    )
+    return banner
+
+
+def apply(image: BytesIO, func: Callable[..., Image.Image], *args):
+    """Run a stage on an image, or on every frame of an animated one.
+
+    Returns:
+        Union[Image.Image, BytesIO]: The result, already a GIF if animated.
+    """
+    with Image.open(image) as img:
+        if is_animated(img):
+            return animate(img, func, *args)
+
+        return func(img, *args)
+
+
+def parse_pipeline(text: str) -> Tuple[str, Chain]:
+    """Parse a chain like `@Dosek pixelate | swirl 90 | jail`
+
+    Args:
+        text (str): The chain, optionally starting with the image argument.
+
+    Raises:
+        commands.BadArgument: A stage does not exist or got wrong arguments.
+
+    Returns:
+        Tuple[str, Chain]: The image argument (or None) and the stages.
+    """
+    image, chain = None, []
+    for i, segment in enumerate(text.split("|")):
+        words = segment.split()
+        if i == 0 and words and words[0] not in STAGES:
+            image, words = words[0], words[1:]
+
+        if not words or words[0] not in STAGES:
+            raise commands.BadArgument(
+                f"Unknown stage `{segment.strip()}`, try: {', '.join(STAGES)}"
             )
-            image = str(avatar) if return_url else await avatar.read()
+
+        name, args = words[0], words[1:]
+        if len(args) > (max_args := STAGES[name].max_args):
+            takes = f"up to {max_args} argument(s)" if max_args else "no arguments"
+            raise commands.BadArgument(f"`{name}` takes {takes}: `{segment.strip()}`")
+
+        try:
+            chain.append((name, tuple(int(arg) for arg in args)))
+        except ValueError:
+            raise commands.BadArgument(f"Stage arguments must be numbers: `{segment}`")
+
+    return image, chain
+
+
+def _run_chain(image: Image.Image, chain: Chain, deadline: float) -> Image.Image:
+    for name, args in chain:
+        if time.perf_counter() > deadline:
+            raise commands.BadArgument("The chain took too long to render.")
+
+        image = STAGES[name](image, *args)
 
     return image
 
 
+def check_pipeline(chain: Chain, size: Tuple[int, int], frames: int = 1) -> None:
+    """Make sure a chain fits the budget before it gets rendered.
+
+    The pixels are summed up over the outputs of every stage, and the time
+    is estimated from how long the stages took as single commands. Both
+    are multiplied by the frames, since every frame runs the whole chain.
+
+    Args:
+        chain (Chain): The parsed stages.
+        size (Tuple[int, int]): The size of the input image.
+        frames (int): How many frames get rendered, see `kept_frames`
+
+    Raises:
+        commands.BadArgument: The chain is over a budget.
+    """
+    if len(chain) > PIPELINE_MAX_STAGES:
+        raise commands.BadArgument(f"Up to {PIPELINE_MAX_STAGES} stages are allowed.")
+
+    pixels, seconds = 0, 0.0
+    ops = renderer.stats["ops"]
+    for name, args in chain:
+        func = STAGES[name]
+        if func.template:
+            size = assets.size(func.template)
+        elif func.output:
+            size = func.output(size, *args)
+
+        pixels += size[0] * size[1]
+        seconds += ops.get(f"Manip.{name}", {}).get("avg_render", 0.0)
+
+    pixels, seconds = pixels * frames, seconds * frames
+    if pixels > PIPELINE_MAX_PIXELS:
+        raise commands.BadArgument("This chain would process too many pixels.")
+
+    if seconds > PIPELINE_MAX_SECONDS:
+        raise commands.BadArgument("This chain would take too long to render.")
+
+
 class Manip:
     """A set of static methods used in the Image extension."""
 
     @staticmethod
     @executor
+    @encoded("webp")
     def typeracer(txt: str):
-        font = ImageFont.truetype(f"{FONT_PATH}/monoid.ttf", size=30)
+        font = assets.font("monoid.ttf", 30)
         w, h = font.getsize_multiline(txt)
 
-        with Image.new("RGB", (w + 10, h + 10)) as base:
-            canvas = ImageDraw.Draw(base)
-            canvas.multiline_text((5, 5), txt, font=font)
-            buffer = BytesIO()
-            base.save(buffer, "png", optimize=True)
-
-        buffer.seek(0)
-        return buffer
+        base = Image.new("RGB", (w + 10, h + 10))
+        canvas = ImageDraw.Draw(base)
+        canvas.multiline_text((5, 5), txt, font=font)
+        return base
 
     @staticmethod
     @executor
+    @encoded("png")
+    @input_size(263)
     def welcome(top_text: str, bottom_text: str, member_avatar: BytesIO):
-        font = ImageFont.truetype(f"{FONT_PATH}/arial_bold.ttf", size=20)
+        font = assets.font("arial_bold.ttf", 20)
         join_w, member_w = font.getsize(bottom_text)[0], font.getsize(top_text)[0]
 
-        with Image.new("RGB", (600, 400)) as card:
-            card.paste(Image.open(member_avatar).resize((263, 263)), (170, 32))
-            draw = ImageDraw.Draw(card)
-            draw.text(
-                ((600 - join_w) / 2, 309), bottom_text, (255, 255, 255), font=font
-            )
-            draw.text(((600 - member_w) / 2, 1), top_text, (169, 169, 169), font=font)
-            buffer = BytesIO()
-            card.save(buffer, "png", optimize=True)
+        card = Image.new("RGB", (600, 400))
+        with Image.open(member_avatar) as avatar:
+            card.paste(avatar.resize((263, 263)), (170, 32))
 
-        buffer.seek(0)
-        return buffer
+        draw = ImageDraw.Draw(card)
+        draw.text(((600 - join_w) / 2, 309), bottom_text, (255, 255, 255), font=font)
+        draw.text(((600 - member_w) / 2, 1), top_text, (169, 169, 169), font=font)
+        return card
 
     @staticmethod
     @executor
-    def pixelate(image: BytesIO):
-        with Image.open(image) as im:
-            small = im.resize((32, 32), resample=Image.BILINEAR)
-            result = small.resize(im.size, Image.NEAREST)
-            buffer = BytesIO()
-            result.save(buffer, "png")
+    @encoded("png")
+    @input_size(128)
+    def welcome_batch(top_text: str, bottom_text: str, avatars: List[BytesIO]):
+        """The welcome card of a join burst, with up to `WELCOME_SLOTS` avatars."""
+        font = assets.font("arial_bold.ttf", 20)
+        join_w, member_w = font.getsize(bottom_text)[0], font.getsize(top_text)[0]
 
-        buffer.seek(0)
-        return buffer
+        card = _welcome_base(len(avatars)).copy()
+        for avatar, position in zip(avatars, _slots(len(avatars))):
+            with Image.open(avatar) as avatar:
+                card.paste(avatar.convert("RGB").resize((128, 128)), position)
+
+        draw = ImageDraw.Draw(card)
+        draw.text(((600 - join_w) / 2, 309), bottom_text, (255, 255, 255), font=font)
+        draw.text(((600 - member_w) / 2, 1), top_text, (169, 169, 169), font=font)
+        return card
 
     @staticmethod
     @executor
+    @encoded("webp")
+    def pixelate(image: BytesIO):
+        return apply(image, _pixelate)
+
+    @staticmethod
+    @executor
+    @encoded("jpeg")
+    @input_size(128)
     def whyareyougae(author: BytesIO, member: BytesIO):
-        author = Image.open(author)
+        img = assets.image("wayg.jpg")
 
-        with Image.open(f"{IMAGE_PATH}/wayg.jpg") as img:
+        with Image.open(author) as author, Image.open(member) as member:
             img.paste(author, (507, 103))
-            img.paste(Image.open(member).resize((128, 128)), (77, 120))
-            buffer = BytesIO()
-            img.save(buffer, "png", optimize=True)
+            img.paste(member.resize((128, 128)), (77, 120))
 
-        buffer.seek(0)
-        return buffer
+        return img
 
     @staticmethod
     @executor
+    @encoded("webp")
+    @input_size(128)
     def fiveguysonegirl(author: BytesIO, member: BytesIO):
-        author = Image.open(author)
+        img = assets.image("5g1g.png")
 
-        with Image.open(f"{IMAGE_PATH}/5g1g.png") as img:
-            img.paste(Image.open(member).resize((128, 128)), (500, 275))
+        with Image.open(author) as author, Image.open(member) as member:
+            img.paste(member.resize((128, 128)), (500, 275))
 
             for i in [(31, 120), (243, 53), (438, 85), (637, 90), (815, 20)]:
                 img.paste(author, i)
 
-            buffer = BytesIO()
-            img.save(buffer, "png", optimize=True)
-
-        buffer.seek(0)
-        return buffer
+        return img
 
     @staticmethod
     @executor
+    @encoded("webp")
+    @input_size(205)
     def wanted(image: BytesIO):
-        image = Image.open(image).resize((189, 205))
-
-        with Image.open(f"{IMAGE_PATH}/wanted.png") as img:
-            img.paste(image, (73, 185))
-            buffer = BytesIO()
-            img.save(buffer, "png")
-
-        buffer.seek(0)
-        return buffer
+        with Image.open(image) as img:
+            return _wanted(img)
 
     @staticmethod
     @executor  # 395, 206 - knocked out; 236, 50 - winner
+    @encoded("jpeg")
+    @input_size(60)
     def fight(winner: BytesIO, knocked_out: BytesIO):
-        winner = Image.open(winner).resize((40, 40))
-        knocked_out = Image.open(knocked_out).resize((60, 60))
+        img = assets.image("fight.jpg")
 
-        with Image.open(f"{IMAGE_PATH}/fight.jpg") as img:
-            img.paste(winner, (236, 50))
-            img.paste(knocked_out.rotate(-90), (395, 206))
-            buffer = BytesIO()
-            img.save(buffer, "png")
+        with Image.open(winner) as winner, Image.open(knocked_out) as knocked_out:
+            img.paste(winner.resize((40, 40)), (236, 50))
+            img.paste(knocked_out.resize((60, 60)).rotate(-90), (395, 206))
 
-        buffer.seek(0)
-        return buffer
+        return img
 
     @staticmethod
     @executor
+    @encoded("png")
     def clyde(txt: str):
-        font = ImageFont.truetype(f"{FONT_PATH}/whitneybook.otf", 18)
-
-        with Image.open(f"{IMAGE_PATH}/clyde.png") as img:
-            draw = ImageDraw.Draw(img)
-            draw.text((72, 33), txt, (255, 255, 255), font=font)
-            buffer = BytesIO()
-            img.save(buffer, "png")
+        font = assets.font("whitneybook.otf", 18)
 
-        buffer.seek(0)
-        return buffer
+        img = assets.image("clyde.png")
+        draw = ImageDraw.Draw(img)
+        draw.text((72, 33), txt, (255, 255, 255), font=font)
+        return img
 
     @staticmethod
     @executor
+    @encoded("jpeg")
     def drake(no: str, yes: str):
         no_wrapped = textwrap.wrap(text=no, width=13)
         yes_wrapped = textwrap.wrap(text=yes, width=13)
-        font = ImageFont.truetype(f"{FONT_PATH}/arial_bold.ttf", size=28)
+        font = assets.font("arial_bold.ttf", 28)
 
-        with Image.open(f"{IMAGE_PATH}/drake.jpg") as img:
-            draw = ImageDraw.Draw(img)
-            draw.text((270, 10), "\n".join(no_wrapped), (0, 0, 0), font=font)
-            draw.text((270, 267), "\n".join(yes_wrapped), (0, 0, 0), font=font)
-            buffer = BytesIO()
-            img.save(buffer, "png")
-
-        buffer.seek(0)
-        return buffer
+        img = assets.image("drake.jpg")
+        draw = ImageDraw.Draw(img)
+        draw.text((270, 10), "\n".join(no_wrapped), (0, 0, 0), font=font)
+        draw.text((270, 267), "\n".join(yes_wrapped), (0, 0, 0), font=font)
+        return img
 
     @staticmethod
     @executor
+    @encoded("webp")
     def jail(image: BytesIO):
-        layout = WI(filename=f"{IMAGE_PATH}/jailbars.png")
-
-        with WI(file=image) as img:
-            w, h = img.size
-            layout.resize(w, h)
-            img.watermark(layout, 0.3)
-            buffer = BytesIO()
-            img.save(file=buffer)
-
-        buffer.seek(0)
-        return buffer
+        return apply(image, _jail)
 
     @staticmethod
     @executor
+    @encoded("webp")
+    @input_size(87)
     def press_f(image: BytesIO):
-        layout = WI(filename=f"{IMAGE_PATH}/f.png")
-
-        with WI(file=image) as img:
-            img.resize(52, 87)
-            img.rotate(-5)
-            buffer = BytesIO()
-            layout.watermark(img, left=310, top=71)
-            layout.save(file=buffer)
-
-        buffer.seek(0)
-        return buffer
+        with Image.open(image) as img:
+            return _press_f(img)
 
     @staticmethod
     @executor
+    @encoded("webp")
     def rainbow(image: BytesIO):
-        layout = WI(filename=f"{IMAGE_PATH}/rainbow.png")
+        return apply(image, _rainbow)
 
-        with WI(file=image) as img:
-            w, h = img.size
-            layout.resize(w, h)
-            img.watermark(layout, 0.5)
-            buffer = BytesIO()
-            img.save(file=buffer)
+    @staticmethod
+    @executor
+    @encoded("webp")
+    def communist(image: BytesIO):
+        return apply(image, _communist)
 
-        buffer.seek(0)
-        return buffer
+    @staticmethod
+    @executor
+    @encoded("webp")
+    def swirl(degree: int, image: BytesIO):
+        return apply(image, _swirl, degree)
 
     @staticmethod
     @executor
-    def communist(image: BytesIO):
-        layout = WI(filename=f"{IMAGE_PATH}/communist-flag.jpg")
+    def pipeline(chain: Chain, image: BytesIO, timeout: float):
+        """Run a chain of stages on one decoded image, encoding only the result.
 
-        with WI(file=image) as img:
-            w, h = img.size
-            layout.resize(w, h)
-            img.watermark(layout, 0.7)
-            buffer = BytesIO()
-            img.save(file=buffer)
+        The output is encoded the way the last stage's operation is,
+        animated images are run frame by frame into a GIF.
+        """
+        deadline = time.perf_counter() + timeout
+        result = apply(image, _run_chain, chain, deadline)
+        if isinstance(result, BytesIO):
+            return result
 
-        buffer.seek(0)
-        return buffer
+        return encode(result, getattr(Manip, chain[-1][0]).encoding)
 
     @staticmethod
     @executor
-    def swirl(degree: int, image: BytesIO):
-        if degree > 360:
-            degree = 360
+    @input_size(256)
+    def triggered(image: BytesIO):
+        """A shaking, red-tinted GIF of the image, always a GIF."""
+        margin = max(max(abs(dx), abs(dy)) for dx, dy in TRIGGERED_SHAKE)
+        size = 256 + margin * 2
 
-        elif degree < -360:
-            degree = -360
+        face = Image.new("RGB", (size, size))
+        with Image.open(image) as img:
+            img = img.convert("RGBA").resize((size, size))
+            face.paste(img, mask=img)
 
-        with WI(file=image) as img:
-            img.swirl(degree=degree)
-            buffer = BytesIO()
-            img.save(file=buffer)
+        face = Image.blend(face, Image.new("RGB", face.size, (255, 0, 0)), 0.3)
+        banner = _triggered_banner(256)
 
+        buffer = BytesIO()
+        writer = GifWriter(buffer, (256, 256))
+        for dx, dy in TRIGGERED_SHAKE:
+            x, y = margin + dx, margin + dy
+            frame = face.crop((x, y, x + 256, y + 256))
+            frame.paste(banner, (dx // 2, 256 - banner.height + abs(dy) // 2))
+            writer.write(frame, 20)
+
+        writer.close()
         buffer.seek(0)
         return buffer
 
+    @staticmethod
+    @executor
+    @encoded("png")
+    @input_size(256)
+    def ascii(image: BytesIO, columns: int = 80):
+        return apply(image, _ascii, columns)
+
     # https://github.com/AlexFlipnote/alex_api_archive/blob/master/render/achievement.py
     # thanks a lot!
+    @staticmethod
+    @executor
+    @encoded("webp")
     def achievement(title: str, ach: str, colour=(255, 255, 0, 255)):
-        front = Image.open(f"{IMAGE_PATH}/achievement/achievement.png")
-        txt = Image.new("RGBA", (len(ach) * 15, 64))
-        fnt = ImageFont.truetype(f"{FONT_PATH}/minecraft.ttf", 16)
-        d = ImageDraw.Draw(txt)
-
-        w, h = d.textsize(ach, font=fnt)
-        w = max(320, w)
-
-        mid = Image.new("RGBA", (w + 20, 64), (255, 255, 255, 0))
-
-        midd = Image.open(f"{IMAGE_PATH}/achievement/mid.png")
-        end = Image.open(f"{IMAGE_PATH}/achievement/end.png")
+        font = assets.font("minecraft.ttf", 16)
+        w = max(320, font.getsize(ach)[0])
 
-        for i in range(0, w):
-            mid.paste(midd, (i, 0))
-        mid.paste(end, (w, 0))
+        im = Image.new("RGBA", (w + 80, 64))
+        im.paste(assets.image("achievement/achievement.png"), (0, 0))
+        # the middle sprite is a single column, stretching it equals tiling.
+        middle = assets.image("achievement/mid.png").resize((w, 64), Image.NEAREST)
+        im.paste(middle, (60, 0))
+        im.paste(assets.image("achievement/end.png"), (w + 60, 0))
 
         txt = Image.new("RGBA", (w + 20, 64), (255, 255, 255, 0))
-
         d = ImageDraw.Draw(txt)
-        d.text((0, 9), title, font=fnt, fill=colour)
-        d.text((0, 29), ach, font=fnt, fill=(255, 255, 255, 255))
-
-        mid = Image.alpha_composite(mid, txt)
-
-        im = Image.new("RGBA", (w + 80, 64))
-
-        im.paste(front, (0, 0))
-        im.paste(mid, (60, 0))
-
-        buffer = BytesIO()
-        im.save(buffer, "PNG")
-        buffer.seek(0)
-        return buffer
+        d.text((0, 9), title, font=font, fill=colour)
+        d.text((0, 29), ach, font=font, fill=(255, 255, 255, 255))
+        im.alpha_composite(txt, (60, 0))
+        return im
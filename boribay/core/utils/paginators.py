@@ -1,4 +1,6 @@
+from collections import OrderedDict
 from contextlib import suppress
+from typing import Dict, Tuple
 
 import discord
 from discord.ext import menus
@@ -33,3 +35,113 @@ class EmbedPageSource(menus.ListPageSource):
         maximum = self.get_max_pages()
         embed.set_author(name=f"Page {menu.current_page + 1} / {maximum}")
         return embed
+
+
+class KeysetPageSource(menus.PageSource):
+    """A page source that fetches one page at a time from the database.
+
+    Pages are fetched with keyset pagination, i.e `WHERE (keys) > (last row)`
+    instead of `OFFSET`, so a page costs the same no matter how deep it is.
+    A few recently shown pages are kept, so flipping back and forth does
+    not hit the database. `OFFSET` is only used for jumps to a page that
+    has no known neighbour.
+
+    The query has to have a `WHERE` clause and must not be ordered, the
+    ordering is done by the `keys`, which have to be unique together.
+    Subclasses implement `format_page` as usual.
+    """
+
+    def __init__(
+        self,
+        pool,
+        query: str,
+        *args,
+        keys: Tuple[str, ...] = ("id",),
+        per_page: int = 10,
+        cache_pages: int = 3,
+    ):
+        self.pool = pool
+        self.query = query
+        self.args = args
+        self.keys = keys
+        self.per_page = per_page
+        self.cache_pages = cache_pages
+        self.count = None
+
+        self._pages: Dict[int, list] = OrderedDict()
+        self._first: Dict[int, tuple] = {}
+        self._last: Dict[int, tuple] = {}
+
+    async def prepare(self):
+        if self.count is not None:
+            return
+
+        self.count = await self.pool.fetchval(
+            f"SELECT count(*) FROM ({self.query}) AS counted", *self.args
+        )
+
+    def is_paginating(self) -> bool:
+        return self.count > self.per_page
+
+    def get_max_pages(self) -> int:
+        return max(1, -(-self.count // self.per_page))
+
+    def _order(self, descending: bool = False) -> str:
+        direction = " DESC" if descending else ""
+        return ", ".join(key + direction for key in self.keys)
+
+    def _seek(self, op: str, cursor: tuple) -> str:
+        start = len(self.args) + 1
+        params = ", ".join(f"${i}" for i in range(start, start + len(cursor)))
+        return f"{self.query} AND ({', '.join(self.keys)}) {op} ({params})"
+
+    async def _fetch(self, page_number: int) -> list:
+        order, limit = self._order(), self.per_page
+        last_page = self.get_max_pages() - 1
+
+        if page_number == 0:
+            return await self.pool.fetch(
+                f"{self.query} ORDER BY {order} LIMIT {limit}", *self.args
+            )
+
+        if cursor := self._last.get(page_number - 1):
+            return await self.pool.fetch(
+                f"{self._seek('>', cursor)} ORDER BY {order} LIMIT {limit}",
+                *self.args,
+                *cursor,
+            )
+
+        if cursor := self._first.get(page_number + 1):
+            query = f"{self._seek('<', cursor)} ORDER BY {self._order(True)}"
+            rows = await self.pool.fetch(
+                f"{query} LIMIT {limit}", *self.args, *cursor
+            )
+            return rows[::-1]
+
+        if page_number == last_page:
+            limit = self.count - last_page * self.per_page
+            rows = await self.pool.fetch(
+                f"{self.query} ORDER BY {self._order(True)} LIMIT {limit}", *self.args
+            )
+            return rows[::-1]
+
+        offset = page_number * self.per_page
+        return await self.pool.fetch(
+            f"{self.query} ORDER BY {order} LIMIT {limit} OFFSET {offset}", *self.args
+        )
+
+    async def get_page(self, page_number: int) -> list:
+        if page_number in self._pages:
+            self._pages.move_to_end(page_number)
+            return self._pages[page_number]
+
+        rows = await self._fetch(page_number)
+        if rows:
+            self._first[page_number] = tuple(rows[0][k] for k in self.keys)
+            self._last[page_number] = tuple(rows[-1][k] for k in self.keys)
+
+        self._pages[page_number] = rows
+        while len(self._pages) > self.cache_pages:
+            self._pages.popitem(last=False)
+
+        return rows
@@ -0,0 +1,441 @@
+import asyncio
+import contextlib
+import functools
+import hashlib
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from boribay.settings import IMAGE_ENCODING
+
+from ..exceptions import RenderOverloaded
+from .assets import assets
+
+__all__ = ("RenderCache", "RenderService", "executor", "renderer")
+
+logger = logging.getLogger("bot.render")
+
+Key = Tuple[str, str]
+
+# The sync functions that may run in a worker, addressed by (module, qualname).
+# Workers import the module on their own, which registers the function again,
+# so only the key and the arguments have to be pickled.
+_functions: Dict[Key, Callable] = {}
+
+
+def _warm_up() -> None:
+    """Worker initializer, decodes templates before the first job arrives."""
+    assets.preload()
+
+
+def _ping() -> None:
+    pass
+
+
+def _call(key: Key, args: tuple, kwargs: dict) -> Tuple[float, Any]:
+    """Run a registered function in a worker and time it."""
+    if key not in _functions:
+        importlib.import_module(key[0])
+
+    start = time.perf_counter()
+    result = _functions[key](*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+class RenderCache:
+    """Finished renders addressed by the operation, its parameters, the
+    hash of the input bytes and the version of the assets.
+
+    Parameters
+    ----------
+    max_bytes : int
+        The budget of the in-memory LRU tier.
+    directory : Optional[str]
+        Where to keep the on-disk tier, which is disabled if not given.
+    max_disk_bytes : int
+        The budget of the on-disk tier, the least recently used files
+        get removed beyond it.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int,
+        directory: Optional[str] = None,
+        max_disk_bytes: int = 0,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._disk_lock = threading.Lock()
+
+        self.directory = None
+        self.disk_size = 0
+        if directory:
+            self.directory = Path(directory)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.disk_size = sum(f.stat().st_size for f in self.directory.iterdir())
+
+    def __repr__(self) -> str:
+        return (
+            f"<RenderCache entries={len(self._memory)} size={self.size} "
+            f"disk_size={self.disk_size}>"
+        )
+
+    @staticmethod
+    def key(key: Key, args: tuple, kwargs: dict) -> str:
+        """Make the cache key of a render.
+
+        Parameters
+        ----------
+        key : Key
+            The key of the operation.
+        args : tuple
+            Positional arguments, buffers are hashed by their contents.
+        kwargs : dict
+            Keyword arguments, same as above.
+
+        Returns
+        -------
+        str
+            The hex digest to look the render up by.
+        """
+        # the global encoder and the templates change what every render looks like.
+        digest = hashlib.sha256(repr((key, IMAGE_ENCODING, assets.version)).encode())
+        for name, value in [*enumerate(args), *sorted(kwargs.items())]:
+            if isinstance(value, BytesIO):
+                value = value.getvalue()
+            elif not isinstance(value, bytes):
+                value = repr(value).encode()
+
+            digest.update(f"|{name}:{len(value)}:".encode())
+            digest.update(value)
+
+        return digest.hexdigest()
+
+    def _remember(self, digest: str, data: bytes) -> None:
+        if digest in self._memory:
+            self._memory.move_to_end(digest)
+            return
+
+        self._memory[digest] = data
+        self.size += len(data)
+        while self.size > self.max_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self.size -= len(evicted)
+
+    def _read(self, digest: str) -> Optional[bytes]:
+        path = self.directory / digest
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        os.utime(path)  # the access time is what the eviction goes by.
+        return data
+
+    def _write(self, digest: str, data: bytes) -> None:
+        path = self.directory / digest
+        with self._disk_lock:
+            if path.exists():
+                return
+
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+            self.disk_size += len(data)
+
+            if self.disk_size <= self.max_disk_bytes:
+                return
+
+            files = sorted(self.directory.iterdir(), key=lambda f: f.stat().st_mtime)
+            for file in files:
+                if self.disk_size <= self.max_disk_bytes:
+                    break
+
+                with contextlib.suppress(FileNotFoundError):
+                    size = file.stat().st_size
+                    file.unlink()
+                    self.disk_size -= size
+
+    async def get(self, digest: str) -> Optional[BytesIO]:
+        """Look a render up, the memory tier first.
+
+        Parameters
+        ----------
+        digest : str
+            The key made by `RenderCache.key`
+
+        Returns
+        -------
+        Optional[BytesIO]
+            A fresh buffer of the render or None if it is not cached.
+        """
+        if (data := self._memory.get(digest)) is not None:
+            self._memory.move_to_end(digest)
+            self.hits += 1
+            return BytesIO(data)
+
+        if self.directory is not None:
+            if (data := await asyncio.to_thread(self._read, digest)) is not None:
+                self._remember(digest, data)
+                self.disk_hits += 1
+                return BytesIO(data)
+
+        self.misses += 1
+        return None
+
+    async def put(self, digest: str, buffer: BytesIO) -> None:
+        """Store a finished render in both tiers.
+
+        Parameters
+        ----------
+        digest : str
+            The key made by `RenderCache.key`
+        buffer : BytesIO
+            The render, it is not modified.
+        """
+        data = buffer.getvalue()
+        self._remember(digest, data)
+        if self.directory is not None:
+            await asyncio.to_thread(self._write, digest, data)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._memory),
+            "size": self.size,
+            "disk_size": self.disk_size,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+class RenderService:
+    """A process pool dedicated to the `Manip` renders.
+
+    Until `start` is called jobs run in the loop's default executor,
+    so the renders keep working in scripts and benchmarks.
+
+    Renders are looked up in `cache` before being submitted, if it is set.
+    """
+
+    def __init__(self) -> None:
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.cache: Optional[RenderCache] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.workers = 0
+        self.queue_size = 0
+        self.max_waiting = 0
+        self.overload = "queue"
+
+        self.running = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._timings = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+
+    def __repr__(self) -> str:
+        return (
+            f"<RenderService workers={self.workers} running={self.running} "
+            f"waiting={self.waiting}>"
+        )
+
+    @staticmethod
+    def register(func: Callable) -> Key:
+        """Make a sync function available to the workers.
+
+        Parameters
+        ----------
+        func : Callable
+            A module-level function or a static method.
+
+        Returns
+        -------
+        Key
+            The key to submit the function by.
+        """
+        key = (func.__module__, func.__qualname__)
+        _functions[key] = func
+        return key
+
+    async def start(
+        self, *, workers: int, queue_size: int, overload: str, max_waiting: int
+    ) -> None:
+        """Spawn the workers and wait until they have warmed up.
+
+        Parameters
+        ----------
+        workers : int
+            How many worker processes to spawn.
+        queue_size : int
+            How many jobs may be handed to the pool at once.
+        overload : str
+            What to do with jobs beyond `queue_size`: ``"queue"`` makes them
+            wait for their turn and ``"reject"`` raises `RenderOverloaded`.
+        max_waiting : int
+            How many jobs may wait for their turn with ``"queue"``, jobs
+            beyond that raise `RenderOverloaded` too.
+        """
+        if overload not in ("queue", "reject"):
+            raise ValueError(f"Unknown overload policy: {overload!r}")
+
+        self.workers = workers
+        self.queue_size = queue_size
+        self.overload = overload
+        self.max_waiting = max_waiting
+        self._semaphore = asyncio.Semaphore(queue_size)
+        self._pool = await self._spawn()
+        logger.info(f"Started {workers} render workers.")
+
+    async def _spawn(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_up,
+        )
+
+        # spawning the workers now instead of on the first command.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(pool, _ping) for _ in range(self.workers))
+        )
+        return pool
+
+    async def restart(self) -> None:
+        """Replace the workers with fresh ones, e.g after the assets changed.
+
+        Jobs the old workers have already taken still finish.
+        """
+        if self._pool is not None:
+            old, self._pool = self._pool, await self._spawn()
+            old.shutdown(wait=False)
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def submit(self, key: Key, *args, **kwargs) -> Any:
+        """Run a registered function in the pool, unless its result is cached.
+
+        Parameters
+        ----------
+        key : Key
+            The key returned by `register`.
+
+        Raises
+        ------
+        RenderOverloaded
+            The queue is full and the overload policy is ``"reject"``, or
+            too many jobs are waiting already.
+
+        Returns
+        -------
+        Any
+            Whatever the function returned.
+        """
+        if self.cache is None:
+            return await self._submit(key, args, kwargs)
+
+        digest = self.cache.key(key, args, kwargs)
+        if (cached := await self.cache.get(digest)) is not None:
+            return cached
+
+        result = await self._submit(key, args, kwargs)
+        if isinstance(result, BytesIO):
+            await self.cache.put(digest, result)
+
+        return result
+
+    async def _submit(self, key: Key, args: tuple, kwargs: dict) -> Any:
+        loop = asyncio.get_running_loop()
+
+        if self._pool is None:
+            start = time.perf_counter()
+            result = await loop.run_in_executor(
+                None, lambda: _functions[key](*args, **kwargs)
+            )
+            self._record(key, 0.0, time.perf_counter() - start)
+            return result
+
+        if self._semaphore.locked() and (
+            self.overload == "reject" or self.waiting >= self.max_waiting
+        ):
+            self.rejected += 1
+            raise RenderOverloaded()
+
+        queued = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            elapsed, result = await loop.run_in_executor(
+                self._pool, _call, key, args, kwargs
+            )
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+        self._record(key, time.perf_counter() - queued - elapsed, elapsed)
+        return result
+
+    def _record(self, key: Key, waited: float, elapsed: float) -> None:
+        timing = self._timings[key[1]]
+        timing[0] += 1
+        timing[1] += waited
+        timing[2] += elapsed
+        timing[3] = max(timing[3], elapsed)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """The queue depth and the timings of every operation, in seconds."""
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "ops": {
+                name: {
+                    "count": count,
+                    "avg_wait": waited / count,
+                    "avg_render": elapsed / count,
+                    "max_render": peak,
+                }
+                for name, (count, waited, elapsed, peak) in self._timings.items()
+            },
+        }
+
+
+renderer = RenderService()
+
+
+def executor(func):
+    """Wraps a sync function into an async function.
+
+    This provides us non-blocking wrapped functions, run by the render service.
+    """
+    key = renderer.register(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        """Sync function wrapper."""
+        return await renderer.submit(key, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import textwrap
+from abc import ABC, abstractmethod
+from collections import deque
+from io import BytesIO
+from typing import Deque, Dict, List, Tuple
+
+import discord
+
+from .utils import WELCOME_SLOTS, Manip, cdn_size, filename
+
+__all__ = ("AutoroleQueue", "WelcomeQueue")
+
+logger = logging.getLogger("bot")
+
+Join = Tuple[discord.Member, int]  # a member and the member count at their join.
+
+
+class GuildQueue(ABC):
+    """Items pushed per guild, handled by one worker task per guild.
+
+    The worker is started by the first push and stops once the guild
+    has nothing left, so idle guilds cost nothing.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[int, Deque] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def __repr__(self) -> str:
+        pending = sum(map(len, self._pending.values()))
+        return f"<{type(self).__name__} guilds={len(self._tasks)} pending={pending}>"
+
+    def push(self, guild_id: int, item) -> None:
+        self._pending.setdefault(guild_id, deque()).append(item)
+        if guild_id not in self._tasks:
+            self._tasks[guild_id] = asyncio.create_task(self._run(guild_id))
+
+    async def _run(self, guild_id: int) -> None:
+        try:
+            while self._pending.get(guild_id):
+                try:
+                    await self.process(guild_id)
+                except discord.HTTPException as e:
+                    logger.warning(f"{type(self).__name__} in {guild_id}: {e}")
+                except Exception as e:
+                    logger.exception(type(e).__name__, exc_info=e)
+
+        finally:
+            self._pending.pop(guild_id, None)
+            self._tasks.pop(guild_id, None)
+
+    @abstractmethod
+    async def process(self, guild_id: int) -> None:
+        """Handle some of the pending items of a guild, removing them."""
+
+    def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+
+
+class WelcomeQueue(GuildQueue):
+    """Sends welcome cards, merging the joins of a burst into one card.
+
+    Joins are collected for `window` seconds before anything is rendered,
+    a single join gets the usual card while a burst gets one card with
+    the avatars of the first members and one message. Members are numbered
+    by the member count at their join, not at the time of the render.
+
+    Parameters
+    ----------
+    bot : Boribay
+        The bot instance, for the guild settings and the avatar fetcher.
+    window : float
+        How many seconds to wait for more joins before rendering.
+    concurrency : int
+        How many guilds can render cards at once.
+    """
+
+    def __init__(self, bot, *, window: float, concurrency: int) -> None:
+        super().__init__()
+        self.bot = bot
+        self.window = window
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    def push(self, member: discord.Member) -> None:
+        super().push(member.guild.id, (member, member.guild.member_count))
+
+    async def process(self, guild_id: int) -> None:
+        await asyncio.sleep(self.window)
+        joins: List[Join] = list(self._pending.pop(guild_id))
+        members = [member for member, _ in joins]
+
+        guild = members[0].guild
+        channel_id = self.bot.guild_cache[guild_id].get("welcome_channel")
+        if not channel_id or (channel := guild.get_channel(channel_id)) is None:
+            return
+
+        async with self._semaphore:
+            image, name = await self.render(joins)
+
+        content = None
+        if len(members) > 1:
+            names = ", ".join(str(member) for member in members)
+            content = textwrap.shorten(names, width=2000, placeholder=" ...")
+
+        await channel.send(content, file=discord.File(image, name))
+
+    async def render(self, joins: List[Join]) -> Tuple[BytesIO, str]:
+        """Render the card for the joins of a guild.
+
+        Args:
+            joins (List[Join]): The members and their numbers, in join order.
+
+        Returns:
+            Tuple[BytesIO, str]: The card and its file name.
+        """
+        if len(joins) == 1:
+            member, number = joins[0]
+            operation = Manip.welcome
+            size = cdn_size(operation.input_size)
+            avatar = await self.bot.fetcher.fetch(member.display_avatar, size=size)
+            image = await operation(
+                top_text=f"Member #{number}",
+                bottom_text=f"{member} just spawned in the server.",
+                member_avatar=BytesIO(avatar),
+            )
+            return image, filename(str(member), operation)
+
+        operation = Manip.welcome_batch
+        size = cdn_size(operation.input_size)
+        shown = joins[:WELCOME_SLOTS]
+        avatars = await asyncio.gather(
+            *(self.bot.fetcher.fetch(m.display_avatar, size=size) for m, _ in shown)
+        )
+        numbers = [number for _, number in joins]
+        image = await operation(
+            top_text=f"Members #{min(numbers)}-#{max(numbers)}",
+            bottom_text=f"{len(joins)} members just spawned in the server.",
+            avatars=[BytesIO(avatar) for avatar in avatars],
+        )
+        return image, filename("welcome", operation)
+
+
+class AutoroleQueue(GuildQueue):
+    """Gives the autorole to new members at a limited rate per guild.
+
+    Members that left or already have the role by their turn are skipped.
+
+    Parameters
+    ----------
+    rate : float
+        How many roles to give per second in a guild.
+    """
+
+    def __init__(self, *, rate: float) -> None:
+        super().__init__()
+        self.delay = 1 / rate
+
+    def push(self, member: discord.Member, role_id: int) -> None:
+        super().push(member.guild.id, (member, role_id))
+
+    async def process(self, guild_id: int) -> None:
+        member, role_id = self._pending[guild_id].popleft()
+        guild = member.guild
+
+        role = guild.get_role(role_id)
+        if role and guild.get_member(member.id) and role not in member.roles:
+            try:
+                await member.add_roles(role, reason="Autorole")
+            finally:
+                await asyncio.sleep(self.delay)
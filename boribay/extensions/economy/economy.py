@@ -1,5 +1,4 @@
 import asyncio
-import copy
 import random
 from typing import Optional
 
@@ -7,7 +6,6 @@ import discord
 from discord.ext import commands
 
 from boribay.core import exceptions, utils
-from boribay.core.database import Cache
 
 from .games import Trivia, Work
 from .utils import CasinoConverter
@@ -22,21 +20,40 @@ class Economics(utils.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.economy_cache = Cache("SELECT * FROM economy", "user_id", self.bot.pool)
 
     async def cog_check(self, ctx: utils.Context):
         return await commands.guild_only().predicate(ctx)
 
+    @staticmethod
+    async def _account(ctx: utils.Context, member: discord.Member) -> dict:
+        """Get the economy data of a member from the user cache.
+
+        Args:
+            ctx (utils.Context): To get the user cache.
+            member (discord.Member): The member whose data is needed.
+
+        Raises:
+            UserError: If the member is not registered yet.
+
+        Returns:
+            dict: The cached row of the member.
+        """
+        if not (data := await ctx.user_cache.fetch(member.id)):
+            raise exceptions.UserError(
+                f"{member} is not registered in the economics system."
+            )
+
+        return data
+
     @utils.command()
     async def register(self, ctx: utils.Context) -> None:
         """Register into Boribay economics system."""
-        if self.economy_cache[ctx.author.id]:
+        if await ctx.user_cache.fetch(ctx.author.id):
             return await ctx.send("You are already registered in the economics system.")
 
-        await self.bot.pool.execute(
-            "INSERT INTO users(user_id) VALUES($1)", ctx.author.id
+        await ctx.db.push(
+            "INSERT INTO users(user_id) VALUES($1) RETURNING *", ctx.author.id
         )
-        await self.economy_cache.refresh()
         await ctx.send(
             "Welcome to the economics system! (test has successfully been passed.)"
         )
@@ -65,14 +82,22 @@ class Economics(utils.Cog):
         await Trivia(ctx).run(difficulty)
 
     @utils.command(aliases=("lb",))
-    async def leaderboard(self, ctx: utils.Context, limit: int = 5) -> None:
+    async def leaderboard(
+        self, ctx: utils.Context, limit: int = 5, local: bool = False
+    ) -> None:
         """Boribay economics leaderboard. Defaults to 5 users,
         however you can specify the limitation of the leaderboard.
 
+        Example:
+            **{p}leaderboard 10** - the 10 richest users of Boribay.
+            **{p}leaderboard 10 yes** - the 10 richest members of this server.
+
         Parameters
         ----------
         limit : int, optional
             Set the limit of users you want to see, by default 5
+        local : bool, optional
+            Whether to rank only the members of this server, by default False
 
         Raises
         ------
@@ -84,15 +109,14 @@ class Economics(utils.Cog):
                 "I cannot get why do you need more than 10 people."
             )
 
-        data = await ctx.bot.pool.fetch(
-            "SELECT * FROM users ORDER by wallet + bank DESC"
-        )
+        within = [m.id for m in ctx.guild.members] if local else None
         users = [
-            f'**{ctx.bot.get_user(row["user_id"]) or row["user_id"]}** - {row["wallet"] + row["bank"]} {BATYR}'
-            for row in data[:limit]
+            f"**{ctx.bot.get_user(user_id) or user_id}** - {networth} {BATYR}"
+            for user_id, networth in ctx.bot.leaderboard.top(limit, within=within)
         ]
 
-        embed = ctx.embed(title="The Global Leaderboard", description="\n".join(users))
+        title = f"The {ctx.guild} Leaderboard" if local else "The Global Leaderboard"
+        embed = ctx.embed(title=title, description="\n".join(users))
         await ctx.send(embed=embed)
 
     @utils.group()
@@ -126,7 +150,7 @@ class Economics(utils.Cog):
             )
 
         member = member or ctx.author
-        query = "UPDATE users SET bank = bank + $1 WHERE user_id = $2;"
+        query = "UPDATE users SET bank = bank + $1 WHERE user_id = $2 RETURNING *;"
         await ctx.db.push(query, amount, member.id)
         await ctx.send(f"✅ Successfully added **{amount} {BATYR}** to **{member}**.")
 
@@ -155,7 +179,7 @@ class Economics(utils.Cog):
                 "Balance adding limit has reached. " "Specify between 100 and 100 000."
             )
 
-        query = "UPDATE users SET bank = bank - $1 WHERE user_id = $2;"
+        query = "UPDATE users SET bank = bank - $1 WHERE user_id = $2 RETURNING *;"
         await ctx.db.push(query, amount, member.id)
         await ctx.send(
             f"✅ Successfully removed **{amount} {BATYR}** from **{member}**."
@@ -176,20 +200,18 @@ class Economics(utils.Cog):
             member (Optional[discord.Member]): A member whose card you'd like to see.
 
         Raises:
-            DefaultError: If the member has no profile card set yet.
+            UserError: If the member has no profile card set yet.
         """
         member = member or ctx.author
 
-        if not (data := ctx.user_cache[member.id]):
-            raise exceptions.DefaultError(f"{member} has no profile card.")
-
-        data = copy.copy(data)
+        data = dict(await self._account(ctx, member))
 
         embed = ctx.embed(
             title=f"{member}'s profile card",
             description=data.pop("bio") or "No bio has been set.",
         ).set_thumbnail(url=member.avatar)
 
+        data["global rank"] = f"#{ctx.bot.leaderboard.rank(member.id)}"
         embed.add_field(
             name="📊 Statistics",
             value="\n".join(f"• **{k.title()}:** {v}" for k, v in data.items()),
@@ -212,7 +234,7 @@ class Economics(utils.Cog):
         Raises:
             DefaultError: If you ask to {p}dep more money than you do have.
         """
-        data = ctx.user_cache[ctx.author.id]
+        data = await self._account(ctx, ctx.author)
         wallet = data.get("wallet")
         amount = amount or wallet
 
@@ -221,9 +243,12 @@ class Economics(utils.Cog):
                 "Transfering amount cannot be higher than your wallet balance"
             )
 
-        query = (
-            "UPDATE users SET bank = bank + $1, wallet = wallet - $1 WHERE user_id = $2"
-        )
+        query = """
+        UPDATE users
+        SET bank = bank + $1, wallet = wallet - $1
+        WHERE user_id = $2
+        RETURNING *
+        """
 
         await ctx.db.push(query, amount, ctx.author.id)
         await ctx.send(f"Successfully transfered **{amount}** {BATYR} into your bank!")
@@ -243,7 +268,7 @@ class Economics(utils.Cog):
         Raises:
             DefaultError: If you ask to {p}wd more money than you do have.
         """
-        data = ctx.user_cache[ctx.author.id]
+        data = await self._account(ctx, ctx.author)
         bank = data.get("bank")
         amount = amount or bank
 
@@ -256,6 +281,7 @@ class Economics(utils.Cog):
         UPDATE users
         SET bank = bank - $1, wallet = wallet + $1
         WHERE user_id = $2
+        RETURNING *
         """
 
         await ctx.db.push(query, amount, ctx.author.id)
@@ -277,7 +303,7 @@ class Economics(utils.Cog):
         Raises:
             DefaultError: If you have less than 100 batyrs on your balance.
         """
-        if (wallet := ctx.user_cache[ctx.author.id]["wallet"]) < 100:
+        if (wallet := (await self._account(ctx, ctx.author))["wallet"]) < 100:
             raise exceptions.DefaultError(
                 f"You have nothing to pay (less than 100 {BATYR})"
             )
@@ -294,6 +320,7 @@ class Economics(utils.Cog):
                 f"It should be between 10 and 10 000 {BATYR}."
             )
 
+        await self._account(ctx, member)
         await ctx.db.double("wallet", amount, ctx.author, member)
         await ctx.send(f"Transfered **{amount}** {BATYR} to **{member}**")
 
@@ -320,12 +347,15 @@ class Economics(utils.Cog):
         """
         author = ctx.author.id
 
-        if (bank := ctx.user_cache[author]["bank"]) < 1000:
+        if (bank := (await self._account(ctx, ctx.author))["bank"]) < 1000:
             raise exceptions.DefaultError(
                 f"Setting bio requires at least 1000 {BATYR} (You have {bank})."
             )
 
-        query = "UPDATE users SET bio = $1, bank = bank - 1000 WHERE user_id = $2;"
+        query = (
+            "UPDATE users SET bio = $1, bank = bank - 1000 "
+            "WHERE user_id = $2 RETURNING *;"
+        )
         await ctx.db.push(query, information, author)
         await ctx.send("✅ Set your bio successfully.")
 
@@ -335,7 +365,7 @@ class Economics(utils.Cog):
 
         This is useful when you want just to remove your bio without paying.
         """
-        if not ctx.user_cache[ctx.author.id]["bio"]:
+        if not (await self._account(ctx, ctx.author))["bio"]:
             raise exceptions.DefaultError(
                 "You do not currently have bio set, "
                 "so there is no point on trying to disable it."
@@ -346,7 +376,8 @@ class Economics(utils.Cog):
         )
         if confirmation:
             await ctx.db.push(
-                "UPDATE users SET bio = null WHERE user_id = $1;", ctx.author.id
+                "UPDATE users SET bio = null WHERE user_id = $1 RETURNING *;",
+                ctx.author.id,
             )
             await ctx.send("✅ Disabled your bio successfully.")
 
@@ -372,7 +403,7 @@ class Economics(utils.Cog):
             DefaultError: When a user tries to be funny (rob themself).
             DefaultError: When a victim has not enough batyrs to get robbed.
         """
-        if (member_wallet := ctx.user_cache[member.id]["wallet"]) < 100:
+        if (member_wallet := (await self._account(ctx, member))["wallet"]) < 100:
             raise exceptions.DefaultError(
                 f"{member} had nothing to steal (less than 100 {BATYR})"
             )
@@ -381,8 +412,8 @@ class Economics(utils.Cog):
             population=["success", "caught"], weights=(0.5, 0.5), k=1
         )[0]
         if choice == "caught":
-            author_bank = ctx.user_cache[ctx.author.id]["bank"]
-            fine = author_bank * 0.1
+            author_bank = (await self._account(ctx, ctx.author))["bank"]
+            fine = round(author_bank * 0.1)
             await ctx.db.double("bank", fine, ctx.author, member)
             return await ctx.reply(
                 f"You were caught by police and **{fine}** from your bank "
@@ -390,7 +421,7 @@ class Economics(utils.Cog):
             )
 
         amount = random.randint(100, member_wallet)
-        await ctx.db.double("bank", fine, member, ctx.author)
+        await ctx.db.double("wallet", amount, member, ctx.author)
         await ctx.send(f"✅ Stole **{amount}** {BATYR} from **{member}**")
 
     @utils.command(aliases=("slots",))
@@ -404,28 +435,25 @@ class Economics(utils.Cog):
             bet (CasinoConverter(50)): Your bet amount. Minimum is 50 batyrs.
 
         Raises:
-            DefaultError: If bet' amount reaches limits.
+            NotEnough: If the wallet cannot cover the bet anymore.
         """
         a, b, c = random.choices("🍎🍊🍐🍋🍉🍇🍓🍒", k=3)
         text = f"{a} | {b} | {c}\n{ctx.author.display_name}, "
-        query = "UPDATE users SET wallet = wallet + $1 WHERE user_id = $2;"
 
         if a == b == c:
             result = bet * 20
-            await ctx.send(
-                f"{text}All match, we have a big winner! 🎉 {result} {BATYR}!"
-            )
+            text += f"All match, we have a big winner! 🎉 {result} {BATYR}!"
 
         elif (a == b) or (a == c) or (b == c):
             result = bet * 2
-            await ctx.send(f"{text}2 match, you won! 🎉 {result} {BATYR}!")
+            text += f"2 match, you won! 🎉 {result} {BATYR}!"
 
         else:
-            query = "UPDATE users SET wallet = wallet - $1 WHERE user_id = $2;"
-            result = bet
-            await ctx.send(f"{text}No matches, I wish you win next time. No batyrs.")
+            result = -bet
+            text += "No matches, I wish you win next time. No batyrs."
 
-        await ctx.db.push(query, result, ctx.author.id)
+        await ctx.db.settle(ctx.author, bet, result)
+        await ctx.send(text)
 
     @utils.command()
     async def work(self, ctx: utils.Context) -> None:
@@ -475,7 +503,7 @@ class Economics(utils.Cog):
         await asyncio.sleep(5.0)
 
         if choice == (answer := random.choice(choices)):
-            query = "UPDATE users SET wallet = wallet + 50 WHERE user_id = $1"
+            query = "UPDATE users SET wallet = wallet + 50 WHERE user_id = $1 RETURNING *"
             embed.title = f"You guessed right! ({answer}) → +50 {BATYR}."
 
             await ctx.db.push(query, ctx.author.id)
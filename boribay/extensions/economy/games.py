@@ -35,9 +35,10 @@ class Work:
             return await ctx.send("❌ Seems you did not provide the number.")
 
         if guessed == number:
-            query = "UPDATE users SET wallet = wallet + 100 WHERE user_id = $1;"
-            await ctx.bot.pool.execute(query, ctx.author.id)
-            await ctx.bot.user_cache.refresh()
+            query = (
+                "UPDATE users SET wallet = wallet + 100 WHERE user_id = $1 RETURNING *;"
+            )
+            await ctx.bot.db.push(query, ctx.author.id)
             return await ctx.send(
                 f"✅ You are right! The number was: {number} → +100 batyrs."
             )
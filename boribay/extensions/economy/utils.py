@@ -3,7 +3,7 @@ from typing import Union
 
 from discord.ext import commands
 
-from boribay.core.exceptions import NotAnInteger, NotEnough, PastMinimum
+from boribay.core.exceptions import NotAnInteger, NotEnough, PastMinimum, UserError
 
 __all__ = ("CasinoConverter",)
 
@@ -105,10 +105,12 @@ def get_amount(_all: float, minimum: int, maximum: int, argument):
 def CasinoConverter(minimum: int = 100, maximum: int = 100_000):
     class _Wrapper(commands.Converter, int):
         async def convert(self, ctx, argument):
-            _all = await ctx.bot.pool.fetchval(
-                "SELECT wallet FROM users WHERE user_id = $1", ctx.author.id
-            )
-            amount = get_amount(_all, minimum, maximum, argument)
+            # The cached balance is enough here, the bet settlement
+            # checks the actual one while writing, see `DatabaseManager.settle`.
+            if not (data := await ctx.user_cache.fetch(ctx.author.id)):
+                raise UserError("You are not registered in the economics system.")
+
+            amount = get_amount(data["wallet"], minimum, maximum, argument)
             return amount
 
     return _Wrapper
@@ -1,5 +1,5 @@
-import os
 import asyncio
+import logging
 import random
 import textwrap
 from io import BytesIO
@@ -10,6 +10,10 @@ import discord
 from discord.ext import commands
 
 from boribay.core import Boribay, utils
+from boribay.core.exceptions import RenderOverloaded
+from boribay.settings import DAGPI_API_KEY, DAGPI_FALLBACK_AFTER
+
+logger = logging.getLogger("bot")
 
 
 class Fun(utils.Cog):
@@ -31,11 +35,50 @@ class Fun(utils.Cog):
         """
         r = await self.bot.session.get(
             f"https://api.dagpi.xyz/image/{url}",
-            headers={"Authorization": os.environ.get('DAGPI_API_KEY')}
+            headers={"Authorization": DAGPI_API_KEY}
         )
         fp = BytesIO(await r.read())
         return discord.File(fp, fn or "dagpi.png")
 
+    async def render_image(
+        self, ctx: utils.Context, image: Optional[str], operation, name: str
+    ) -> discord.File:
+        """Render an image locally, falling back to Dagpi if that fails.
+
+        Dagpi is only tried when `DAGPI_API_KEY` is set and the render pool
+        is overloaded, or the render took longer than `DAGPI_FALLBACK_AFTER`
+        seconds. Any other error is raised as usual.
+
+        Args:
+            ctx (utils.Context): The context to get the image from.
+            image (Optional[str]): The image argument of the command.
+            operation: The Manip operation, e.g `Manip.triggered`
+            name (str): The file name without extension, also the Dagpi endpoint.
+
+        Returns:
+            discord.File: A done to send file.
+        """
+        data = await utils.make_image(ctx, image, size=operation.input_size)
+        if not DAGPI_API_KEY:
+            buffer = await operation(BytesIO(data))
+            return discord.File(buffer, utils.filename(name, operation, buffer))
+
+        try:
+            buffer = await asyncio.wait_for(
+                operation(BytesIO(data)), timeout=DAGPI_FALLBACK_AFTER
+            )
+
+        except (RenderOverloaded, asyncio.TimeoutError) as e:
+            logger.warning(f"Could not render {name} locally ({type(e).__name__}), using Dagpi.")
+            url = await utils.make_image(ctx, image, return_url=True)
+            file = await self.dagpi_image(f"{name}?url={url}")
+            # named after what Dagpi sent, the local encoding does not apply.
+            extension = "gif" if file.fp.getvalue()[:3] == b"GIF" else "png"
+            file.filename = f"{name}.{extension}"
+            return file
+
+        return discord.File(buffer, utils.filename(name, operation, buffer))
+
     @utils.command(aliases=("rps",))
     async def rockpaperscissors(self, ctx: utils.Context) -> None:
         """The Rock-Paper-Scissors game.
@@ -108,12 +151,13 @@ class Fun(utils.Cog):
             content = quote["content"]
             buffer = await utils.Manip.typeracer("\n".join(textwrap.wrap(content, 30)))
 
+        fn = utils.filename("typeracer", utils.Manip.typeracer)
         embed = ctx.embed(
             title="Typeracer", description="see who is the fastest at typing."
-        ).set_image(url="attachment://typeracer.png")
+        ).set_image(url=f"attachment://{fn}")
         embed.set_footer(text=f'© {quote["author"]}')
 
-        race = await ctx.send(file=discord.File(buffer, "typeracer.png"), embed=embed)
+        race = await ctx.send(file=discord.File(buffer, fn), embed=embed)
         await race.add_reaction("🗑")
         start = time()
 
@@ -209,8 +253,7 @@ class Fun(utils.Cog):
         Args:
             image (Optional[str]): An image you want to get "triggered".
         """
-        image = await utils.make_image(ctx, image, return_url=True)
-        file = await self.dagpi_image(f"triggered?url={image}", "triggered.gif")
+        file = await self.render_image(ctx, image, utils.Manip.triggered, "triggered")
         await ctx.send(file=file)
 
     @utils.command(name="ascii")
@@ -223,8 +266,7 @@ class Fun(utils.Cog):
         Args:
             image (Optional[str]): An image you want to ASCII'ize.
         """
-        image = await utils.make_image(ctx, image, return_url=True)
-        file = await self.dagpi_image(f"ascii?url={image}", "ascii.png")
+        file = await self.render_image(ctx, image, utils.Manip.ascii, "ascii")
         await ctx.send(file=file)
 
     @utils.command()
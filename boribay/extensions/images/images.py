@@ -1,12 +1,23 @@
+import asyncio
 import random
 from io import BytesIO
 from typing import Optional
 
 import discord
 from discord.ext import commands
+from PIL import Image
 
 from boribay.core import utils
-from boribay.core.utils.manipulation import Manip, make_image
+from boribay.core.utils.animation import kept_frames
+from boribay.core.utils.manipulation import (
+    Manip,
+    cdn_size,
+    check_pipeline,
+    filename,
+    make_image,
+    parse_pipeline,
+)
+from boribay.settings import PIPELINE_MAX_SECONDS
 
 
 class Images(utils.Cog):
@@ -30,7 +41,7 @@ class Images(utils.Cog):
             member (Optional[discord.Member]): A member you want to grab avatar from.
         """
         member = member or ctx.author
-        await ctx.send(str(member.avatar))
+        await ctx.send(str(member.display_avatar))
 
     @utils.command()
     async def pixelate(self, ctx, image: Optional[str]) -> None:
@@ -43,10 +54,36 @@ class Images(utils.Cog):
             image (Optional[str]): An image you want to pixelate.
         """
         async with ctx.loading:
-            image = await make_image(ctx, image)
+            image = await make_image(ctx, image, animated=True)
             buffer = await Manip.pixelate(BytesIO(image))
 
-        file = discord.File(buffer, "pixelated.png")
+        file = discord.File(buffer, filename("pixelated", Manip.pixelate, buffer))
+        await ctx.send(file=file)
+
+    @utils.command(name="img", aliases=("pipeline",))
+    async def _pipeline(self, ctx: utils.Context, *, chain: str) -> None:
+        """Chain several image operations, the image is rendered only once.
+
+        Available stages: pixelate, wanted, jail, press_f, rainbow, communist,
+        swirl (takes degrees) and ascii (takes columns).
+
+        Example:
+            **{p}img @Dosek pixelate | swirl 90 | jail** - all at once.
+
+        Args:
+            chain (str): Stages separated by `|`, optionally starting with an image.
+        """
+        image, stages = parse_pipeline(chain)
+
+        async with ctx.loading:
+            image = await make_image(ctx, image, animated=True)
+            with Image.open(BytesIO(image)) as im:  # only reads the header.
+                check_pipeline(stages, im.size, kept_frames(im))
+
+            buffer = await Manip.pipeline(stages, BytesIO(image), PIPELINE_MAX_SECONDS)
+
+        last = getattr(Manip, stages[-1][0])
+        file = discord.File(buffer, filename(stages[-1][0], last, buffer))
         await ctx.send(file=file)
 
     @utils.command()
@@ -55,7 +92,7 @@ class Images(utils.Cog):
             raise commands.BadArgument("The text was too long to render.")
 
         buffer = await Manip.achievement(title, "ema")
-        file = discord.File(buffer, "achievement.png")
+        file = discord.File(buffer, filename("achievement", Manip.achievement))
         await ctx.send(file=file)
 
     @utils.command()
@@ -69,10 +106,10 @@ class Images(utils.Cog):
             image (Optional[str]): A member you want to make wanted.
         """
         async with ctx.loading:
-            image = await make_image(ctx, image)
+            image = await make_image(ctx, image, size=Manip.wanted.input_size)
             buffer = await Manip.wanted(BytesIO(image))
 
-        file = discord.File(buffer, "wanted.png")
+        file = discord.File(buffer, filename("wanted", Manip.wanted))
         await ctx.send(file=file)
 
     @utils.command()
@@ -86,10 +123,10 @@ class Images(utils.Cog):
             image (Optional[str]): A member you want to see in jail.
         """
         async with ctx.loading:
-            image = await make_image(ctx, image)
+            image = await make_image(ctx, image, animated=True)
             buffer = await Manip.jail(BytesIO(image))
 
-        file = discord.File(buffer, "jail.png")
+        file = discord.File(buffer, filename("jail", Manip.jail, buffer))
         await ctx.send(file=file)
 
     @utils.command(name="f")
@@ -103,10 +140,10 @@ class Images(utils.Cog):
             image (Optional[str]): A member you want to F.
         """
         async with ctx.loading:
-            image = await make_image(ctx, image)
+            image = await make_image(ctx, image, size=Manip.press_f.input_size)
             buffer = await Manip.press_f(BytesIO(image))
 
-        file = discord.File(buffer, "f.png")
+        file = discord.File(buffer, filename("f", Manip.press_f))
         message = await ctx.send(file=file)
         await message.add_reaction("<:press_f:796264575065653248>")
 
@@ -121,11 +158,14 @@ class Images(utils.Cog):
             member (Optional[str]): A member you would like to 5g1g.
         """
         async with ctx.loading:
-            author = await ctx.author.avatar.replace(size=128).read()
-            member = await make_image(ctx, member)
+            size = cdn_size(Manip.fiveguysonegirl.input_size)
+            author, member = await asyncio.gather(
+                ctx.bot.fetcher.fetch(ctx.author.display_avatar, size=size),
+                make_image(ctx, member, size=size),
+            )
             buffer = await Manip.fiveguysonegirl(BytesIO(author), BytesIO(member))
 
-        file = discord.File(buffer, "5g1g.png")
+        file = discord.File(buffer, filename("5g1g", Manip.fiveguysonegirl))
         await ctx.send(file=file)
 
     @utils.command(aliases=("ko",))
@@ -139,11 +179,14 @@ class Images(utils.Cog):
             member (str): A member you would like to knockout.
         """
         async with ctx.loading:
-            winner = await ctx.author.avatar.replace(size=64).read()
-            knocked_out = await make_image(ctx, member)
+            size = cdn_size(Manip.fight.input_size)
+            winner, knocked_out = await asyncio.gather(
+                ctx.bot.fetcher.fetch(ctx.author.display_avatar, size=size),
+                make_image(ctx, member, size=size),
+            )
             buffer = await Manip.fight(BytesIO(winner), BytesIO(knocked_out))
 
-        file = discord.File(buffer, "fight.png")
+        file = discord.File(buffer, filename("fight", Manip.fight))
         await ctx.send(file=file)
 
     @utils.command()
@@ -162,10 +205,10 @@ class Images(utils.Cog):
         degrees = degrees or random.randint(-360, 360)
 
         async with ctx.loading:
-            image = await make_image(ctx, image)
+            image = await make_image(ctx, image, animated=True)
             buffer = await Manip.swirl(degrees, BytesIO(image))
 
-        file = discord.File(buffer, "swirl.png")
+        file = discord.File(buffer, filename("swirl", Manip.swirl, buffer))
         await ctx.send(file=file)
 
     @utils.command()
@@ -179,10 +222,10 @@ class Images(utils.Cog):
             image (Optional[str]): An image to put under the communist flag.
         """
         async with ctx.loading:
-            image = await make_image(ctx, image)
+            image = await make_image(ctx, image, animated=True)
             buffer = await Manip.communist(BytesIO(image))
 
-        file = discord.File(buffer, "communist.png")
+        file = discord.File(buffer, filename("communist", Manip.communist, buffer))
         await ctx.send(file=file)
 
     @utils.command(aliases=("gay", "gayize"))
@@ -196,10 +239,10 @@ class Images(utils.Cog):
             image (Optional[str]): An image you want to "gayize".
         """
         async with ctx.loading:
-            image = await make_image(ctx, image)
+            image = await make_image(ctx, image, animated=True)
             buffer = await Manip.rainbow(BytesIO(image))
 
-        file = discord.File(buffer, "rainbow.png")
+        file = discord.File(buffer, filename("rainbow", Manip.rainbow, buffer))
         await ctx.send(file=file)
 
     @utils.command(aliases=("wayg",))
@@ -212,13 +255,15 @@ class Images(utils.Cog):
         Args:
             member (Optional[str]): A member you would like to "wayg".
         """
-        author = await ctx.author.avatar.replace(size=128).read()
-
         async with ctx.loading:
-            member = await make_image(ctx, member)
+            size = cdn_size(Manip.whyareyougae.input_size)
+            author, member = await asyncio.gather(
+                ctx.bot.fetcher.fetch(ctx.author.display_avatar, size=size),
+                make_image(ctx, member, size=size),
+            )
             buffer = await Manip.whyareyougae(BytesIO(author), BytesIO(member))
 
-        file = discord.File(buffer, "wayg.png")
+        file = discord.File(buffer, filename("wayg", Manip.whyareyougae))
         await ctx.send(file=file)
 
     @utils.command()
@@ -240,7 +285,7 @@ class Images(utils.Cog):
 
         buffer = await Manip.drake(no, yes)
 
-        file = discord.File(buffer, "drake.png")
+        file = discord.File(buffer, filename("drake", Manip.drake))
         await ctx.send(file=file)
 
     @utils.command()
@@ -261,5 +306,5 @@ class Images(utils.Cog):
 
         buffer = await Manip.clyde(text)
 
-        file = discord.File(buffer, "clyde.png")
+        file = discord.File(buffer, filename("clyde", Manip.clyde))
         await ctx.send(file=file)
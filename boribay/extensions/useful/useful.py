@@ -169,20 +169,14 @@ class Useful(utils.Cog):
         dm : bool, optional
             Whether to DM your list, by default False
         """
-        query = (
-            "SELECT content, jump_url FROM todos WHERE user_id = $1 ORDER BY added_at"
-        )
-        todos = [
-            (todo["content"], todo["jump_url"])
-            for todo in await ctx.bot.pool.fetch(query, ctx.author.id)
-        ]
         dest = ctx.author if dm else ctx.channel
 
         if show_count:
-            return await dest.send(len(todos))
+            query = "SELECT count(*) FROM todos WHERE user_id = $1"
+            return await dest.send(await ctx.bot.pool.fetchval(query, ctx.author.id))
 
         await utils.Paginate(
-            TodoPageSource(ctx, todos), clear_reactions_after=True, timeout=60.0
+            TodoPageSource(ctx), clear_reactions_after=True, timeout=60.0
         ).start(ctx, channel=dest)
 
     @todo.command(name="add")
@@ -218,15 +212,25 @@ class Useful(utils.Cog):
         Args:
             numbers: Range of to-do indexes you want to remove.
         """
+        if not numbers:
+            return await ctx.send_help(ctx.command)
+
+        if not (numbers := [number for number in numbers if number >= 1]):
+            return await ctx.send("To-do numbers start from 1.")
+
+        # Only the head of the list up to the biggest number gets numbered.
         query = """
-        WITH enumerated AS (SELECT todos.content, row_number()
-        OVER (ORDER BY added_at ASC) AS count FROM todos WHERE user_id = $1)
-        DELETE FROM todos WHERE user_id = $1 AND content IN (
-            SELECT enumerated.content FROM enumerated
-            WHERE enumerated.count=ANY($2::bigint[])
-        ) RETURNING content
+        WITH head AS (
+            SELECT id, row_number() OVER (ORDER BY added_at, id) AS number
+            FROM (
+                SELECT id, added_at FROM todos WHERE user_id = $1
+                ORDER BY added_at, id LIMIT $3
+            ) AS first_todos
+        )
+        DELETE FROM todos
+        WHERE id IN (SELECT id FROM head WHERE number = ANY($2::bigint[]))
         """
-        await ctx.bot.pool.execute(query, ctx.author.id, numbers)
+        await ctx.bot.pool.execute(query, ctx.author.id, numbers, max(numbers))
         await ctx.message.add_reaction("✅")
 
     @todo.command(name="info")
@@ -241,11 +245,13 @@ class Useful(utils.Cog):
             number (int): The index of to-do you want to see info about.
         """
         query = """
-        WITH enumerated AS (SELECT todos.content, todos.added_at, todos.jump_url, row_number()
-        OVER (ORDER BY added_at ASC) as count FROM todos WHERE user_id = $1)
-        SELECT * FROM enumerated WHERE enumerated.count = $2
+        SELECT content, added_at, jump_url FROM todos WHERE user_id = $1
+        ORDER BY added_at, id OFFSET $2 LIMIT 1
         """
-        row = await ctx.bot.pool.fetchrow(query, ctx.author.id, number)
+        if number < 1 or not (
+            row := await ctx.bot.pool.fetchrow(query, ctx.author.id, number - 1)
+        ):
+            return await ctx.send(f"You have no to-do with number {number}.")
 
         values = [
             ("Added", f'{time.naturaltime(row["added_at"])} by UTC'),
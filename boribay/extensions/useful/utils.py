@@ -6,6 +6,7 @@ import discord
 from discord.ext import menus
 
 from boribay.core.exceptions import UserError
+from boribay.core.utils import KeysetPageSource
 
 
 class OptionsNotInRange(UserError):
@@ -64,14 +65,19 @@ class Poll:
             await message.add_reaction(emoji)
 
 
-class TodoPageSource(menus.ListPageSource):
+class TodoPageSource(KeysetPageSource):
     """TodoPageSource, a special paginator created for the todo commands parent.
 
-    Takes the list of data, enumerates, then paginates through.
+    Fetches the to-do list page by page, enumerates, then paginates through.
     """
 
-    def __init__(self, ctx, data):
-        super().__init__(data, per_page=10)
+    def __init__(self, ctx):
+        super().__init__(
+            ctx.bot.pool,
+            "SELECT id, content, jump_url, added_at FROM todos WHERE user_id = $1",
+            ctx.author.id,
+            keys=("added_at", "id"),
+        )
         self.ctx = ctx
 
     async def format_page(self, menu, entries):
@@ -85,11 +91,12 @@ class TodoPageSource(menus.ListPageSource):
         else:
             maximum = self.get_max_pages()
             embed.set_author(
-                name=f"Page {menu.current_page + 1} of {maximum} ({len(self.entries)} todos)",
+                name=f"Page {menu.current_page + 1} of {maximum} ({self.count} todos)",
                 icon_url=self.ctx.author.avatar,
             )
             embed.description = "\n".join(
-                f"[{i}]({v[1]}). {v[0]}" for i, v in enumerate(entries, start=offset)
+                f'[{i}]({v["jump_url"]}). {v["content"]}'
+                for i, v in enumerate(entries, start=offset)
             )
 
         return embed
@@ -7,8 +7,57 @@ DISCORD_TOKEN = os.environ.get('DISCORD_TOKEN')
 # Database
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
+# Cache
+USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES', 10_000))
+USER_CACHE_MAX_BYTES = int(os.environ.get('USER_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+
+# Stats
+STATS_FLUSH_INTERVAL = float(os.environ.get('STATS_FLUSH_INTERVAL', 60.0))
+STATS_MAX_PENDING = int(os.environ.get('STATS_MAX_PENDING', 100))
+
+# Rendering
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', 2))
+RENDER_QUEUE_SIZE = int(os.environ.get('RENDER_QUEUE_SIZE', 16))
+RENDER_OVERLOAD = os.environ.get('RENDER_OVERLOAD', 'queue')
+RENDER_MAX_WAITING = int(os.environ.get('RENDER_MAX_WAITING', 64))
+IMAGE_ENCODING = os.environ.get('IMAGE_ENCODING')  # png, webp or jpeg for everything.
+OVERLAY_CACHE_SIZE = int(os.environ.get('OVERLAY_CACHE_SIZE', 32))
+RENDER_CACHE_MAX_BYTES = int(os.environ.get('RENDER_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+RENDER_CACHE_DIR = os.environ.get('RENDER_CACHE_DIR')
+RENDER_CACHE_DISK_MAX_BYTES = int(
+    os.environ.get('RENDER_CACHE_DISK_MAX_BYTES', 512 * 1024 * 1024)
+)
+
+# Assets
+ASSET_CACHE_MAX_BYTES = int(os.environ.get('ASSET_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+ASSET_CACHE_TTL = float(os.environ.get('ASSET_CACHE_TTL', 600.0))
+
+# Image inputs
+IMAGE_DOWNLOAD_TIMEOUT = float(os.environ.get('IMAGE_DOWNLOAD_TIMEOUT', 10.0))
+IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', 8 * 1024 * 1024))
+IMAGE_MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS', 4096 * 4096))
+IMAGE_MAX_FRAMES = int(os.environ.get('IMAGE_MAX_FRAMES', 100))
+IMAGE_MAX_SIDE = int(os.environ.get('IMAGE_MAX_SIDE', 1024))
+
+# Image pipelines
+PIPELINE_MAX_STAGES = int(os.environ.get('PIPELINE_MAX_STAGES', 5))
+PIPELINE_MAX_PIXELS = int(os.environ.get('PIPELINE_MAX_PIXELS', 4 * 1024 * 1024))
+PIPELINE_MAX_SECONDS = float(os.environ.get('PIPELINE_MAX_SECONDS', 10.0))
+ASCII_MAX_PIXELS = int(os.environ.get('ASCII_MAX_PIXELS', 2048 * 2048))
+
+# Animated images, frames over the caps get skipped.
+GIF_MAX_FRAMES = int(os.environ.get('GIF_MAX_FRAMES', 50))
+GIF_MAX_PIXELS = int(os.environ.get('GIF_MAX_PIXELS', 50 * 512 * 512))
+
+# Welcome cards and autoroles
+WELCOME_BATCH_WINDOW = float(os.environ.get('WELCOME_BATCH_WINDOW', 2.0))
+WELCOME_CONCURRENCY = int(os.environ.get('WELCOME_CONCURRENCY', 2))
+AUTOROLE_RATE = float(os.environ.get('AUTOROLE_RATE', 2.0))  # roles per second.
+
 # APIs
 DAGPI_API_KEY = os.environ.get("DAGPI_API_KEY")
+# Seconds a local render of a Dagpi effect may take before Dagpi is tried.
+DAGPI_FALLBACK_AFTER = float(os.environ.get('DAGPI_FALLBACK_AFTER', 10.0))
 WEATHER_API_KEY = os.environ.get('WEATHER_API_KEY')
 
 # IPC
@@ -36,4 +36,4 @@ CREATE TABLE IF NOT EXISTS ideas (
 
 CREATE TABLE IF NOT EXISTS bot_stats (
     command_usage INTEGER DEFAULT 0
-)
\ No newline at end of file
+);
@@ -0,0 +1,26 @@
+-- Cross-process cache invalidation, see `boribay.core.database.CacheListener`.
+CREATE OR REPLACE FUNCTION notify_cache() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('cache', json_build_object(
+        'table', TG_TABLE_NAME,
+        'op', TG_OP,
+        'row', row_to_json(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END)
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS guild_config_notify_cache ON guild_config;
+CREATE TRIGGER guild_config_notify_cache
+    AFTER INSERT OR UPDATE OR DELETE ON guild_config
+    FOR EACH ROW EXECUTE FUNCTION notify_cache();
+
+DROP TRIGGER IF EXISTS users_notify_cache ON users;
+CREATE TRIGGER users_notify_cache
+    AFTER INSERT OR UPDATE OR DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION notify_cache();
+
+DROP TRIGGER IF EXISTS economy_notify_cache ON economy;
+CREATE TRIGGER economy_notify_cache
+    AFTER INSERT OR UPDATE OR DELETE ON economy
+    FOR EACH ROW EXECUTE FUNCTION notify_cache();
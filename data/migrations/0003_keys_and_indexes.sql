@@ -0,0 +1,45 @@
+-- The economy commands work with these columns of `users`.
+ALTER TABLE users ADD COLUMN IF NOT EXISTS wallet INTEGER DEFAULT 0;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS bank INTEGER DEFAULT 0;
+
+-- Duplicated keys would make the primary keys fail, keep the oldest row.
+DELETE FROM users a USING users b WHERE a.user_id = b.user_id AND a.ctid > b.ctid;
+DELETE FROM economy a USING economy b WHERE a.user_id = b.user_id AND a.ctid > b.ctid;
+DELETE FROM guild_config a USING guild_config b
+    WHERE a.guild_id = b.guild_id AND a.ctid > b.ctid;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conrelid = 'users'::regclass AND contype = 'p'
+    ) THEN
+        ALTER TABLE users ADD PRIMARY KEY (user_id);
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conrelid = 'economy'::regclass AND contype = 'p'
+    ) THEN
+        ALTER TABLE economy ADD PRIMARY KEY (user_id);
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'guild_config'::regclass AND contype = 'p'
+    ) THEN
+        ALTER TABLE guild_config ADD PRIMARY KEY (guild_id);
+    END IF;
+END;
+$$;
+
+-- To-do lists are always read per user in insertion order.
+CREATE INDEX IF NOT EXISTS todos_user_id_added_at_idx ON todos (user_id, added_at, id);
+
+-- Net worth ranking.
+CREATE INDEX IF NOT EXISTS users_networth_idx ON users ((wallet + bank) DESC, user_id);
+
+-- Pending/approved suggestion listing.
+CREATE INDEX IF NOT EXISTS ideas_approved_id_idx ON ideas (approved, id);
+
+-- The stats writer only ever updates, so the single row has to exist.
+INSERT INTO bot_stats (command_usage)
+SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM bot_stats);
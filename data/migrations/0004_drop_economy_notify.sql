@@ -0,0 +1,2 @@
+-- Nothing caches the economy table, its changes need no notifications.
+DROP TRIGGER IF EXISTS economy_notify_cache ON economy;
@@ -2,10 +2,12 @@ import asyncio
 import logging
 from dotenv import load_dotenv
 
-from boribay.core.bot import Boribay
-from boribay.main.cli import parse_flags, parse_single_flags
-
+# boribay.settings reads the environment on import, so .env goes first.
 load_dotenv()
+
+from boribay.core.bot import Boribay  # noqa: E402
+from boribay.main.cli import parse_flags, parse_single_flags  # noqa: E402
+
 log = logging.getLogger("bot.main")
 
 